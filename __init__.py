@@ -43,14 +43,24 @@ def safe_unregister_class(cls):
         pass
 
 
-from . import properties, utils, operators, ui, trobleshooting
+from . import properties, utils, worklog, project, storage, validation, operators, ui, trobleshooting, budget, publish, diff, naming, scatter, profiling
 
 modules = (
     properties,
     trobleshooting,
     utils,
+    worklog,
+    project,
+    storage,
+    validation,
     operators,
+    budget,
+    publish,
+    diff,
+    naming,
+    scatter,
     ui,
+    profiling,
 )
 
 def register():
@@ -0,0 +1,242 @@
+"""
+Benchmarks for the export checks, utilities and log code.
+
+Run through headless.py:
+
+    blender -b --python <add-on dir>/headless.py -- bench --size medium --output bench.json
+    blender -b --python <add-on dir>/headless.py -- bench --compare baseline.json --output bench.json
+
+The "scene" suite builds a synthetic asset scene; the "pure" suite is
+bench_pure.py, which has no bpy imports and also runs with plain Python.
+"""
+import bpy
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+
+from . import budget, trobleshooting
+from .bench_pure import SIZES, timeit, compare, pure_benchmarks
+from .trobleshooting import XST_Logger, xst_log_state, log_filter_flags
+from .utils import ensure_child_collection, find_layer_collection
+
+BENCH_ASSET_TYPE = "CH"
+BENCH_ASSET_NAME = "bench"
+
+
+# ----------------------------
+# Synthetic scene
+# ----------------------------
+
+def wipe_data():
+    for data in (bpy.data.objects, bpy.data.meshes, bpy.data.armatures, bpy.data.materials, bpy.data.collections):
+        bpy.data.batch_remove(list(data))
+
+
+def _grid_mesh(name, size):
+    verts = [(x, y, 0.0) for y in range(size + 1) for x in range(size + 1)]
+    faces = [
+        (y * (size + 1) + x, y * (size + 1) + x + 1, (y + 1) * (size + 1) + x + 1, (y + 1) * (size + 1) + x)
+        for y in range(size) for x in range(size)
+    ]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    return mesh
+
+
+def _build_collection_tree(parent, depth, fanout, prefix, leaves):
+    if depth == 0:
+        leaves.append(parent)
+        return
+    for i in range(fanout):
+        child = ensure_child_collection(parent, f"{prefix}_{i}")
+        _build_collection_tree(child, depth - 1, fanout, f"{prefix}_{i}", leaves)
+
+
+def _build_armature(scene_col, asset_name, bones):
+    arm_data = bpy.data.armatures.new(f"RIG-{asset_name}")
+    arm_obj = bpy.data.objects.new(f"RIG-{asset_name}", arm_data)
+    scene_col.objects.link(arm_obj)
+    bpy.context.view_layer.objects.active = arm_obj
+    bpy.ops.object.mode_set(mode="EDIT")
+    parent = None
+    for i in range(bones):
+        bone = arm_data.edit_bones.new(f"DEF-bone_{i:04d}")
+        bone.head = (0.0, 0.0, i * 0.1)
+        bone.tail = (0.0, 0.0, i * 0.1 + 0.1)
+        bone.parent = parent
+        parent = bone
+    bpy.ops.object.mode_set(mode="OBJECT")
+    return arm_obj
+
+
+def populate_asset(top, rig, asset_name, depth, fanout, objects, shared_meshes, materials, bones, seed=0):
+    """ Fill an asset collection with a collection tree, shared-mesh objects, materials and a rig. """
+    rnd = random.Random(seed)
+
+    leaves = []
+    _build_collection_tree(top, depth, fanout, "GEO", leaves)
+
+    mats = [bpy.data.materials.new(f"MAT_{asset_name}_{i:03d}") for i in range(materials)]
+    meshes = []
+    for i in range(max(shared_meshes, 1)):
+        mesh = _grid_mesh(f"GEO-{asset_name}_mesh_{i:04d}", rnd.randint(2, 16))
+        if mats:
+            mesh.materials.append(mats[i % len(mats)])
+        meshes.append(mesh)
+
+    for i in range(objects):
+        obj = bpy.data.objects.new(f"GEO-{asset_name}_{i:05d}", meshes[i % len(meshes)])
+        obj.location = (rnd.uniform(-50, 50), rnd.uniform(-50, 50), 0.0)
+        leaves[i % len(leaves)].objects.link(obj)
+
+    if bones:
+        _build_armature(rig, asset_name, bones)
+
+
+def build_synthetic_scene(depth, fanout, objects, shared_meshes, materials, bones, log_entries,
+                          directory=None, seed=0):
+    """
+    Replace the current data with a synthetic 6_CH_bench asset and save it as
+    CH_bench_V01_mod-B01.blend in directory (a new temporary one by default,
+    which the caller removes).
+    """
+    wipe_data()
+
+    scene = bpy.context.scene
+    top = ensure_child_collection(scene.collection, f"6_{BENCH_ASSET_TYPE}_{BENCH_ASSET_NAME}")
+    rig = ensure_child_collection(top, f"RIG_{BENCH_ASSET_NAME}")
+    ensure_child_collection(rig, f"HLPS_{BENCH_ASSET_NAME}")
+    ensure_child_collection(top, f"WGTS_{BENCH_ASSET_NAME}")
+    scatter = ensure_child_collection(top, "Geo-Scatter")
+    ensure_child_collection(scatter, "Geo-Scatter Geonode")
+    ensure_child_collection(scatter, "Geo-Scatter bench_scatter")
+
+    populate_asset(top, rig, BENCH_ASSET_NAME, depth, fanout, objects, shared_meshes, materials, bones, seed)
+
+    props = scene.xst_asset_panel_props
+    props.asset_type = BENCH_ASSET_TYPE
+    props.asset_name = BENCH_ASSET_NAME
+
+    directory = directory or tempfile.mkdtemp(prefix="xst_bench_")
+    file_path = os.path.join(directory, f"{BENCH_ASSET_TYPE}_{BENCH_ASSET_NAME}_V01_mod-B01.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=file_path)
+
+    _fill_log(bpy.context, log_entries, random.Random(seed))
+    return file_path
+
+
+def _fill_log(context, count, rnd):
+    logger = XST_Logger(context)
+    logger.clear()
+    objects = list(bpy.data.objects)
+    for i in range(count):
+        obj = objects[i % len(objects)] if objects else None
+        logger.log(
+            f"Synthetic finding {i % 50}",
+            details=f"entry {i}",
+            level=rnd.choice(("INFO", "WARNING", "ERROR")),
+            target_type="OBJECT" if obj else "NONE",
+            target_object=obj,
+            target_label=obj.name if obj else "",
+        )
+
+
+def _scene_benchmarks(params, repeat, directory):
+    context = bpy.context
+    results = {}
+    build_synthetic_scene(**params, directory=directory)
+    asset_col = budget.find_asset_collection(context.scene, BENCH_ASSET_TYPE, BENCH_ASSET_NAME)
+    root_layer = context.view_layer.layer_collection
+    collections = list(asset_col.children_recursive)
+    state = xst_log_state(context)
+    logger = XST_Logger(context)
+
+    def find_all_layers():
+        for col in collections:
+            find_layer_collection(root_layer, col)
+
+    def ensure_all():
+        for i in range(len(collections)):
+            ensure_child_collection(asset_col, f"bench_ensure_{i % 64}")
+
+    def log_burst():
+        for i in range(1000):
+            logger.log(f"Burst {i % 20}", level="WARNING")
+
+    def filter_log():
+        state.filter_text = "finding 1"
+        log_filter_flags(state, 1)
+
+    results["model_export_check"] = timeit(
+        lambda: bpy.ops.xanthus_studio_tools.model_export_check(), repeat,
+        setup=lambda: _fill_log(context, params["log_entries"], random.Random(0)),
+    )
+    results["find_layer_collection"] = timeit(find_all_layers, repeat)
+    results["ensure_child_collection"] = timeit(ensure_all, repeat)
+    results["xst_logger_log_1000"] = timeit(
+        log_burst, repeat, setup=lambda: _fill_log(context, params["log_entries"], random.Random(0)),
+    )
+    results["filter_items"] = timeit(filter_log, repeat, setup=trobleshooting._bump_revision)
+    results["group_by_message"] = timeit(
+        lambda: trobleshooting.log_message_groups(state), repeat, setup=trobleshooting._bump_revision,
+    )
+    results["user_index"] = timeit(trobleshooting.XST_UserIndex, repeat)
+    results["budget_report_cold"] = timeit(
+        lambda: budget.build_report(context, asset_col, BENCH_ASSET_TYPE), repeat, setup=budget.clear_cache,
+    )
+    results["budget_report_warm"] = timeit(
+        lambda: budget.build_report(context, asset_col, BENCH_ASSET_TYPE), repeat,
+    )
+    results["create_collection_structure"] = timeit(
+        lambda: bpy.ops.xanthus_studio_tools.create_collection_structure(), repeat,
+    )
+    return results
+
+
+def run(suite="all", size="small", repeat=5, overrides=None):
+    params = dict(SIZES[size])
+    params.update(overrides or {})
+    results = {}
+    meta = {
+        "suite": suite,
+        "size": size,
+        "params": params,
+        "repeat": repeat,
+        "blender": bpy.app.version_string,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+    if suite in {"all", "pure"}:
+        results.update({f"pure.{k}": v for k, v in pure_benchmarks(params, repeat).items()})
+    if suite in {"all", "scene"}:
+        with tempfile.TemporaryDirectory(prefix="xst_bench_") as directory:
+            results.update({f"scene.{k}": v for k, v in _scene_benchmarks(params, repeat, directory).items()})
+
+    return {"meta": meta, "results": results}
+
+
+def headless_bench(args):
+    overrides = {key: getattr(args, key) for key in SIZES["small"] if getattr(args, key, None) is not None}
+    report = run(args.suite, args.size, args.repeat, overrides)
+
+    for name, result in sorted(report["results"].items()):
+        print(f"[bench] {name:<40} median {result['median'] * 1000:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"[bench] REGRESSION {name}: {old * 1000:.3f} ms -> {new * 1000:.3f} ms (x{ratio:.2f})")
+        return 1 if regressions else 0
+    return 0
@@ -0,0 +1,170 @@
+"""
+Benchmarks that need no bpy: chunking, log writing / parsing and project
+lookup. bench.py runs them as its "pure" suite inside Blender; they also
+run with plain Python from the add-on directory:
+
+    python bench_pure.py --size medium --output pure.json
+    python bench_pure.py --compare baseline.json --output pure.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tempfile
+
+try:
+    from . import project, storage, worklog
+except ImportError:  # 直接以 python bench_pure.py 執行，不經過需要 bpy 的 __init__
+    import project, storage, worklog
+
+SIZES = {
+    "small": dict(depth=2, fanout=3, objects=200, shared_meshes=20, materials=8, bones=32, log_entries=500),
+    "medium": dict(depth=3, fanout=4, objects=2000, shared_meshes=100, materials=32, bones=128, log_entries=5000),
+    "large": dict(depth=4, fanout=5, objects=10000, shared_meshes=400, materials=64, bones=512, log_entries=20000),
+}
+
+
+# ----------------------------
+# Timing
+# ----------------------------
+
+def timeit(func, repeat=5, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "repeat": repeat,
+    }
+
+
+def compare(baseline, current, threshold=1.25):
+    """ [(name, baseline median, current median, ratio)] of benchmarks slower than threshold x baseline. """
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old["median"]:
+            continue
+        ratio = result["median"] / old["median"]
+        if ratio > threshold:
+            regressions.append((name, old["median"], result["median"], ratio))
+    return regressions
+
+
+# ----------------------------
+# Benchmarks
+# ----------------------------
+
+def _log_record(i):
+    # 與 write_work_version_log 相同的格式
+    version = f"V{i % 99 + 1:02d}"
+    lines = [
+        "-" * 60,
+        "User    : bench",
+        f"Time    : 2024-01-01 00:00:{i % 60:02d}",
+        "Asset   : CH_bench",
+        f"Version : {version}",
+        f"Path    : /proj/work/char/bench/CH_bench_{version}_mod-B01.blend",
+        "-" * 60,
+    ]
+    return "\n".join(lines) + "\n\n"
+
+
+def pure_benchmarks(params, repeat):
+    results = {}
+    records = [_log_record(i) for i in range(min(params["log_entries"], 5000))]
+
+    with tempfile.TemporaryDirectory(prefix="xst_bench_") as directory:
+        burst_path = os.path.join(directory, "burst_log.txt")
+
+        def write_burst():
+            with worklog.coalesce():
+                for record in records:
+                    worklog.append_record(burst_path, record)
+
+        def reset_burst():
+            if os.path.exists(burst_path):
+                os.remove(burst_path)
+
+        log_path = os.path.join(directory, "work_version_log.txt")
+        worklog.write_records(log_path, records)
+
+        # 專案內多層資料夾，每次從空快取開始找專案根目錄
+        root = os.path.join(directory, "project")
+        leaves = [os.path.join(root, "work", "char", f"asset_{i % 50:02d}", "v") for i in range(params["objects"])]
+        for leaf in set(leaves):
+            os.makedirs(leaf, exist_ok=True)
+        with open(os.path.join(root, project.PROJECT_MARKER), "w", encoding="utf-8") as f:
+            f.write("")
+
+        results["worklog_coalesced"] = timeit(write_burst, repeat, setup=reset_burst)
+        results["read_work_version_log"] = timeit(lambda: worklog.read_work_version_log(log_path), repeat)
+        results["find_project_root"] = timeit(
+            lambda: [project.find_project_root(leaf) for leaf in leaves], repeat, setup=project.clear_cache,
+        )
+        project.clear_cache()
+
+    blob = random.Random(0).randbytes(1024 * 1024) * 16
+    results["chunk_boundaries_16mb"] = timeit(lambda: storage.chunk_boundaries(blob), repeat)
+    return results
+
+
+# ----------------------------
+# Command line
+# ----------------------------
+
+def run(size="small", repeat=5, overrides=None):
+    params = dict(SIZES[size])
+    params.update(overrides or {})
+    meta = {
+        "suite": "pure",
+        "size": size,
+        "params": params,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    results = {f"pure.{k}": v for k, v in pure_benchmarks(params, repeat).items()}
+    return {"meta": meta, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench_pure.py")
+    parser.add_argument("--size", default="small", choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--compare", default="", help="baseline JSON; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.repeat)
+    for name, result in sorted(report["results"].items()):
+        print(f"[bench] {name:<40} median {result['median'] * 1000:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"[bench] REGRESSION {name}: {old * 1000:.3f} ms -> {new * 1000:.3f} ms (x{ratio:.2f})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+import bpy
+from types import SimpleNamespace
+from bpy.app.handlers import persistent
+from bpy.types import Operator, Panel
+from bpy.props import BoolProperty
+from .project import project_for_file
+from .utils import get_addon_preferences
+
+TOP_OFFENDERS = 8
+ROOT_ROW_NAME = "(根目錄物件)"
+
+# ----------------------------
+# Cache
+# ----------------------------
+# 全部以 session_uid 為 key；只有 depsgraph 回報變動的 datablock 會被重算，
+# 面板 draw 時只讀取 _report，不做任何計算。
+
+_object_costs = {}      # object uid -> (triangles, mesh uid, mesh name)
+_material_images = {}   # material uid -> tuple of image uids
+_image_bytes = {}       # image uid -> (name, estimated bytes)
+_dirty_objects = set()
+_report = None
+
+
+def clear_cache():
+    _object_costs.clear()
+    _material_images.clear()
+    _image_bytes.clear()
+    _dirty_objects.clear()
+
+
+def _evaluated_triangles(obj, depsgraph):
+    """ Triangle count of the evaluated geometry, read from element counts only. """
+    obj_eval = obj.evaluated_get(depsgraph)
+
+    if obj.type == "MESH":
+        mesh = obj_eval.data
+        # 每個 n-gon 三角化後為 loop_total - 2 個三角面
+        return len(mesh.loops) - 2 * len(mesh.polygons)
+
+    if obj.type in {"CURVE", "SURFACE", "FONT", "META"}:
+        try:
+            mesh = obj_eval.to_mesh()
+        except RuntimeError:
+            return 0
+        try:
+            return len(mesh.loops) - 2 * len(mesh.polygons) if mesh else 0
+        finally:
+            obj_eval.to_mesh_clear()
+
+    return 0
+
+
+def _node_tree_images(node_tree, found, visited):
+    if not node_tree or node_tree.session_uid in visited:
+        return
+    visited.add(node_tree.session_uid)
+
+    for node in node_tree.nodes:
+        if node.type in {"TEX_IMAGE", "TEX_ENVIRONMENT"} and node.image:
+            found[node.image.session_uid] = node.image
+        elif node.type == "GROUP":
+            _node_tree_images(node.node_tree, found, visited)
+
+
+def _image_cost(image):
+    width, height = image.size
+    if not width or not height:
+        return 0
+    channels = image.channels or 4
+    bytes_per_channel = 4 if image.is_float else 1
+    # 4/3 為 mipmap 額外的記憶體
+    return int(width * height * channels * bytes_per_channel * 4 / 3)
+
+
+def _material_image_uids(mat):
+    uid = mat.session_uid
+    cached = _material_images.get(uid)
+    if cached is not None:
+        return cached
+
+    found = {}
+    if mat.use_nodes:
+        _node_tree_images(mat.node_tree, found, set())
+
+    for image_uid, image in found.items():
+        if image_uid not in _image_bytes:
+            _image_bytes[image_uid] = (image.name, _image_cost(image))
+
+    cached = tuple(found)
+    _material_images[uid] = cached
+    return cached
+
+
+def _object_cost(obj, depsgraph):
+    uid = obj.session_uid
+    cached = _object_costs.get(uid)
+    if cached is not None and uid not in _dirty_objects:
+        return cached
+
+    mesh = obj.data if obj.type == "MESH" else None
+    cached = (
+        _evaluated_triangles(obj, depsgraph),
+        mesh.session_uid if mesh else None,
+        mesh.name if mesh else "",
+    )
+    _object_costs[uid] = cached
+    _dirty_objects.discard(uid)
+    return cached
+
+
+def _collection_row(name, objects, depsgraph):
+    triangles = 0
+    meshes = {}
+    images = set()
+    offenders = []
+
+    for obj in objects:
+        obj_tris, mesh_uid, mesh_name = _object_cost(obj, depsgraph)
+        triangles += obj_tris
+        if mesh_uid is not None:
+            meshes[mesh_uid] = mesh_name
+        # material_slots 同時涵蓋 DATA 與 OBJECT 連結的材質
+        for slot in obj.material_slots:
+            if slot.material:
+                images.update(_material_image_uids(slot.material))
+        if obj_tris:
+            offenders.append((obj_tris, obj.name))
+
+    texture_bytes = sum(_image_bytes[uid][1] for uid in images if uid in _image_bytes)
+
+    return {
+        "name": name,
+        "triangles": triangles,
+        "objects": len(objects),
+        "meshes": sorted(meshes.values()),
+        "images": images,
+        "texture_bytes": texture_bytes,
+        "offenders": offenders,
+    }
+
+
+def find_asset_collection(scene, asset_type, asset_name):
+    return scene.collection.children.get(f"6_{asset_type}_{asset_name}")
+
+
+def build_report(context, asset_col, asset_type):
+    """ Compute (or refresh from cache) the budget report of an asset collection. """
+    global _report
+
+    depsgraph = context.evaluated_depsgraph_get()
+
+    rows = []
+    if asset_col.objects:
+        rows.append(_collection_row(ROOT_ROW_NAME, list(asset_col.objects), depsgraph))
+    for child in asset_col.children:
+        rows.append(_collection_row(child.name, list(child.all_objects), depsgraph))
+
+    all_objects = {}
+    all_images = set()
+    offenders = []
+    for row in rows:
+        all_images |= row.pop("images")
+        offenders.extend(row.pop("offenders"))
+    for obj in asset_col.all_objects:
+        all_objects[obj.session_uid] = obj
+
+    image_offenders = sorted(
+        (_image_bytes[uid] for uid in all_images if uid in _image_bytes),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    rows.sort(key=lambda row: row["triangles"], reverse=True)
+    offenders.sort(reverse=True)
+
+    _report = {
+        "collection": asset_col.name,
+        "asset_type": asset_type,
+        "triangles": sum(_object_costs[uid][0] for uid in all_objects if uid in _object_costs),
+        "objects": len(all_objects),
+        "meshes": len({_object_costs[uid][1] for uid in all_objects if uid in _object_costs} - {None}),
+        "texture_bytes": sum(size for _, size in image_offenders),
+        "rows": rows,
+        "top_objects": offenders[:TOP_OFFENDERS],
+        "top_images": image_offenders[:TOP_OFFENDERS],
+    }
+    return _report
+
+
+def get_report():
+    return _report
+
+
+def get_budget(context, asset_type):
+    """ Budget for asset_type: add-on preferences, overridden by [budgets.<type>] in project.toml. """
+    prefs = get_addon_preferences(context)
+    budget = getattr(prefs, f"budget_{asset_type.lower()}", None) if prefs else None
+
+    project = project_for_file(bpy.data.filepath)
+    overrides = project.budget(asset_type) if project else {}
+    if not overrides:
+        return budget
+
+    values = {
+        "max_triangles": budget.max_triangles if budget else 0,
+        "max_texture_mb": budget.max_texture_mb if budget else 0.0,
+        "max_objects": budget.max_objects if budget else 0,
+    }
+    values.update({key: overrides[key] for key in values if key in overrides})
+    return SimpleNamespace(**values)
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    # 只標記變動，不在 handler 內計算
+    for update in depsgraph.updates:
+        id_orig = update.id.original
+        if isinstance(id_orig, bpy.types.Object):
+            if update.is_updated_geometry or update.is_updated_shading:
+                _dirty_objects.add(id_orig.session_uid)
+        elif isinstance(id_orig, bpy.types.Material):
+            _material_images.pop(id_orig.session_uid, None)
+        elif isinstance(id_orig, bpy.types.Image):
+            _image_bytes.pop(id_orig.session_uid, None)
+            _material_images.clear()
+
+
+@persistent
+def _on_load_post(*args):
+    global _report
+    clear_cache()
+    _report = None
+
+
+# ----------------------------
+# Operator + Panel
+# ----------------------------
+
+class XST_OT_budget_refresh(Operator):
+    bl_idname = "xanthus_studio_tools.budget_refresh"
+    bl_label = "更新預算統計"
+
+    full: BoolProperty(
+        name="完整重算",
+        description="清除快取並重新計算所有物件",
+        default=False,
+    ) # type: ignore
+
+    def execute(self, context):
+        props = context.scene.xst_asset_panel_props
+        name = props.asset_name.strip()
+        asset_col = find_asset_collection(context.scene, props.asset_type, name)
+        if not asset_col:
+            self.report({"ERROR"}, f"找不到 Collection: 6_{props.asset_type}_{name}")
+            return {"CANCELLED"}
+
+        if self.full:
+            clear_cache()
+
+        build_report(context, asset_col, props.asset_type)
+        return {"FINISHED"}
+
+
+def _format_mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def _budget_label(layout, label, value, limit, text):
+    row = layout.row()
+    ratio = value / limit if limit else 0.0
+    row.alert = bool(limit) and value > limit
+    row.label(text=label)
+    row.label(text=f"{text}  ({ratio:.0%})" if limit else text)
+
+
+class XST_PT_budget(Panel):
+    bl_label = "輸出預算"
+    bl_idname = "XST_PT_budget"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Xanthus Tools"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    @classmethod
+    def poll(cls, context):
+        prefs = get_addon_preferences(context)
+        return bool(prefs and prefs.asset_panel)
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.operator("xanthus_studio_tools.budget_refresh", icon="FILE_REFRESH")
+        row.operator("xanthus_studio_tools.budget_refresh", text="", icon="TRASH").full = True
+
+        report = get_report()
+        if not report:
+            layout.label(text="尚未統計", icon="INFO")
+            return
+
+        budget = get_budget(context, report["asset_type"])
+        max_tris = budget.max_triangles if budget else 0
+        max_tex = int(budget.max_texture_mb * 1024 * 1024) if budget else 0
+        max_objects = budget.max_objects if budget else 0
+
+        box = layout.box()
+        box.label(text=report["collection"], icon="OUTLINER_COLLECTION")
+        _budget_label(box, "三角面", report["triangles"], max_tris, f"{report['triangles']:,}")
+        _budget_label(box, "貼圖記憶體", report["texture_bytes"], max_tex, _format_mb(report["texture_bytes"]))
+        _budget_label(box, "物件數", report["objects"], max_objects, str(report["objects"]))
+        box.label(text=f"獨立 Mesh: {report['meshes']}")
+
+        box = layout.box()
+        box.label(text="子 Collection", icon="OUTLINER_COLLECTION")
+        for item in report["rows"]:
+            row = box.row()
+            ratio = item["triangles"] / max_tris if max_tris else 0.0
+            row.alert = ratio > 0.5
+            row.label(text=item["name"])
+            row.label(text=f"{item['triangles']:,} ({ratio:.0%})")
+            row.label(text=_format_mb(item["texture_bytes"]))
+            row.label(text=f"{item['objects']} obj / {len(item['meshes'])} mesh")
+
+        if report["top_objects"]:
+            box = layout.box()
+            box.label(text="三角面最多", icon="MESH_DATA")
+            for tris, name in report["top_objects"]:
+                row = box.row()
+                row.label(text=name)
+                row.label(text=f"{tris:,}")
+
+        if report["top_images"]:
+            box = layout.box()
+            box.label(text="貼圖最大", icon="IMAGE_DATA")
+            for name, size in report["top_images"]:
+                row = box.row()
+                row.label(text=name)
+                row.label(text=_format_mb(size))
+
+
+classes = (
+    XST_OT_budget_refresh,
+    XST_PT_budget,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,294 @@
+"""
+Version diff between two saved work versions.
+
+Each version is summarized (object/mesh/material/bone names, element counts,
+vertex hashes) in a background Blender process; summaries are cached per
+manifest sha256 (or path, size, mtime without a manifest) so a version is
+only opened once. The diff of two summaries is written to the Debug Log.
+"""
+import bpy
+import os
+import json
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from bpy.types import Operator
+from bpy.props import EnumProperty
+from . import storage
+from .trobleshooting import XST_Logger
+from .utils import mesh_fingerprint, work_version_enum_items
+
+SUMMARY_VERSION = 1
+SUMMARY_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "xanthus_studio_tools", "summaries")
+HEADLESS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "headless.py")
+BONE_MATCH_DIGITS = 4
+
+
+# ----------------------------
+# Summaries
+# ----------------------------
+
+def summarize_current():
+    """ Compact summary of the datablocks of the open file. """
+    meshes = {}
+    for mesh in bpy.data.meshes:
+        meshes[mesh.name_full] = {
+            "verts": len(mesh.vertices),
+            "polys": len(mesh.polygons),
+            "tris": len(mesh.loops) - 2 * len(mesh.polygons),
+            "hash": mesh_fingerprint(mesh),
+        }
+
+    objects = {
+        obj.name_full: {
+            "type": obj.type,
+            "data": obj.data.name_full if obj.data else "",
+            "parent": obj.parent.name_full if obj.parent else "",
+        }
+        for obj in bpy.data.objects
+    }
+
+    armatures = {}
+    for arm in bpy.data.armatures:
+        armatures[arm.name_full] = {
+            bone.name: [
+                [round(v, BONE_MATCH_DIGITS) for v in bone.head_local],
+                [round(v, BONE_MATCH_DIGITS) for v in bone.tail_local],
+                bone.parent.name if bone.parent else "",
+            ]
+            for bone in arm.bones
+        }
+
+    return {
+        "version": SUMMARY_VERSION,
+        "file": bpy.data.filepath,
+        "objects": objects,
+        "meshes": meshes,
+        "materials": sorted(mat.name_full for mat in bpy.data.materials),
+        "armatures": armatures,
+    }
+
+
+def _summary_cache_path(path):
+    """
+    Cache file of path's summary: keyed on the manifest sha256 when the
+    version has a matching manifest (dehydrated or not), else on size / mtime.
+    """
+    try:
+        manifest = storage.read_manifest(path)
+    except (OSError, ValueError):
+        manifest = None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        stat = None
+
+    if manifest and (stat is None or (stat.st_size, stat.st_mtime_ns) == (manifest.get("size"), manifest.get("mtime_ns"))):
+        key = f"{SUMMARY_VERSION}|sha256:{manifest['sha256']}"
+    elif stat is not None:
+        key = f"{SUMMARY_VERSION}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    else:
+        raise FileNotFoundError(f"找不到版本檔案或 manifest：{path}")
+    return os.path.join(SUMMARY_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def _load_summary(cache_path, path):
+    with open(cache_path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    # 內容相同的版本共用同一份摘要，檔名以實際比較的版本為準
+    summary["file"] = path
+    return summary
+
+
+def summarize_file(path):
+    """
+    Summary of a .blend on disk, from the cache or a background Blender process.
+    A dehydrated version is only rebuilt on a cache miss and removed again after.
+    """
+    cache_path = _summary_cache_path(path)
+    try:
+        return _load_summary(cache_path, path)
+    except (OSError, ValueError):
+        pass
+
+    os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+    rebuilt = not os.path.exists(path)
+    storage.ensure_version_file(path)
+    try:
+        cmd = [
+            bpy.app.binary_path,
+            "-b", path,
+            "--python-exit-code", "1",
+            "--python", HEADLESS_SCRIPT,
+            "--", "summarize", "--output", cache_path,
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True, errors="replace")
+    finally:
+        if rebuilt:
+            os.remove(path)
+    if proc.returncode != 0:
+        raise RuntimeError(f"無法讀取 {path}：{proc.stderr[-500:]}")
+    return _load_summary(cache_path, path)
+
+
+def summarize_files(paths):
+    # 每個版本一個背景 Blender，同時讀取
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        return list(pool.map(summarize_file, paths))
+
+
+# ----------------------------
+# Diff
+# ----------------------------
+
+def _diff_bones(arm_name, old_bones, new_bones):
+    findings = []
+    removed = {name: data for name, data in old_bones.items() if name not in new_bones}
+    added = {name: data for name, data in new_bones.items() if name not in old_bones}
+
+    # 位置相同、名稱不同的骨頭視為改名
+    by_position = {}
+    for name, (head, tail, _) in removed.items():
+        by_position.setdefault((tuple(head), tuple(tail)), []).append(name)
+
+    for name, (head, tail, _) in sorted(added.items()):
+        candidates = by_position.get((tuple(head), tuple(tail)))
+        if candidates:
+            old_name = candidates.pop(0)
+            del removed[old_name]
+            findings.append(("INFO", f"Bone renamed: {old_name} -> {name}", arm_name))
+        else:
+            findings.append(("INFO", f"Bone added: {name}", arm_name))
+
+    for name in sorted(removed):
+        findings.append(("WARNING", f"Bone removed: {name}", arm_name))
+    return findings
+
+
+def diff_summaries(old, new):
+    """ [(level, message, details, object name)] describing what changed from old to new. """
+    findings = []
+    old_objects, new_objects = old["objects"], new["objects"]
+
+    for name in sorted(new_objects.keys() - old_objects.keys()):
+        findings.append(("INFO", f"Object added: {name}", new_objects[name]["type"], name))
+    for name in sorted(old_objects.keys() - new_objects.keys()):
+        findings.append(("WARNING", f"Object removed: {name}", old_objects[name]["type"], ""))
+
+    old_meshes, new_meshes = old["meshes"], new["meshes"]
+    for name in sorted(new_objects.keys() & old_objects.keys()):
+        old_mesh = old_meshes.get(old_objects[name]["data"])
+        new_mesh = new_meshes.get(new_objects[name]["data"])
+        if not old_mesh or not new_mesh:
+            continue
+        if old_mesh["tris"] != new_mesh["tris"]:
+            delta = new_mesh["tris"] - old_mesh["tris"]
+            findings.append((
+                "INFO",
+                f"Triangles {old_mesh['tris']:,} -> {new_mesh['tris']:,} ({delta:+,}): {name}",
+                f"verts {old_mesh['verts']:,} -> {new_mesh['verts']:,}",
+                name,
+            ))
+        elif old_mesh["hash"] != new_mesh["hash"]:
+            findings.append(("INFO", f"Geometry changed: {name}", "same element counts", name))
+
+    old_mats, new_mats = set(old["materials"]), set(new["materials"])
+    for name in sorted(new_mats - old_mats):
+        findings.append(("INFO", f"Material added: {name}", "", ""))
+    for name in sorted(old_mats - new_mats):
+        findings.append(("WARNING", f"Material removed: {name}", "", ""))
+
+    for arm_name in sorted(new["armatures"].keys() & old["armatures"].keys()):
+        for level, message, details in _diff_bones(arm_name, old["armatures"][arm_name], new["armatures"][arm_name]):
+            findings.append((level, message, details, ""))
+
+    old_tris = sum(mesh["tris"] for mesh in old_meshes.values())
+    new_tris = sum(mesh["tris"] for mesh in new_meshes.values())
+    findings.insert(0, (
+        "INFO",
+        f"Total triangles {old_tris:,} -> {new_tris:,} ({new_tris - old_tris:+,})",
+        f"{os.path.basename(old['file'])} -> {os.path.basename(new['file'])}",
+        "",
+    ))
+    return findings
+
+
+def log_diff(context, findings):
+    logger = XST_Logger(context)
+    logger.clear()
+    for level, message, details, obj_name in findings:
+        obj = bpy.data.objects.get(obj_name) if obj_name else None
+        logger.log(
+            message,
+            details=details,
+            level=level,
+            target_type="OBJECT" if obj else "NONE",
+            target_object=obj,
+            target_label=obj_name,
+        )
+
+
+# ----------------------------
+# Headless
+# ----------------------------
+
+def headless_summarize(args):
+    """ `headless.py summarize --output x.json`: write the summary of the open file. """
+    summary = summarize_current()
+    tmp_path = f"{args.output}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, separators=(",", ":"))
+    os.replace(tmp_path, args.output)
+    return 0
+
+
+def headless_diff(args):
+    """ `headless.py diff old.blend new.blend`: print the diff of two versions. """
+    old, new = summarize_files([args.old, args.new])
+    for level, message, details, _ in diff_summaries(old, new):
+        print(f"[diff] {level:<7} {message}" + (f"  ({details})" if details else ""))
+    return 0
+
+
+# ----------------------------
+# Operator
+# ----------------------------
+
+class XST_OT_version_diff(Operator):
+    bl_idname = "xst.version_diff"
+    bl_label = "Diff Work Versions"
+
+    old_version: EnumProperty(name="Old", items=work_version_enum_items) # type: ignore
+    new_version: EnumProperty(name="New", items=work_version_enum_items) # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        if "NONE" in (self.old_version, self.new_version) or self.old_version == self.new_version:
+            self.report({"ERROR"}, "請選擇兩個不同的版本")
+            return {"CANCELLED"}
+
+        try:
+            old, new = summarize_files([self.old_version, self.new_version])
+        except (RuntimeError, OSError, ValueError, KeyError) as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+
+        findings = diff_summaries(old, new)
+        log_diff(context, findings)
+        self.report({"INFO"}, f"{len(findings)} 項差異已寫入 Debug Log")
+        return {"FINISHED"}
+
+
+classes = (
+    XST_OT_version_diff,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
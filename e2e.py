@@ -0,0 +1,534 @@
+"""
+End-to-end checks for the pipeline operators on a mock project.
+
+Run through headless.py:
+
+    blender -b --python <add-on dir>/headless.py -- e2e --sizes small medium --output e2e.json
+    blender -b --python <add-on dir>/headless.py -- e2e --compare e2e_baseline.json
+
+For every fixture size a temporary project tree is created, a synthetic asset
+is built and set_name_to_selected, create_collection_structure,
+normalize_names, save_to_project and model_export_check are run through
+bpy.ops. The collection layout, work_version_log.txt and the export
+visibility state are checked, and every step is timed. With --compare a step
+slower than the baseline (by more than --threshold, after correcting for the
+calibration times of both machines) fails the run; without a baseline each
+step has to stay within TIME_BUDGETS scaled by this machine's calibration.
+"""
+import bpy
+import os
+import sys
+import json
+import hashlib
+import argparse
+import time
+import shutil
+import subprocess
+import random
+import struct
+import platform
+import tempfile
+
+from . import bench, project, storage, validation, worklog
+from .trobleshooting import xst_log_state
+from .utils import (
+    ensure_child_collection,
+    find_layer_collection,
+    build_default_blend_name,
+    write_work_version_log,
+    read_work_version_log,
+)
+
+E2E_ASSET_TYPE = "CH"
+E2E_ASSET_NAME = "e2e"
+
+# 每個步驟的時間上限（秒），在 calibrate() 約 REFERENCE_CALIBRATION 秒的機器上設定；
+# 其他機器依 calibrate() 的結果等比例放寬或收緊
+REFERENCE_CALIBRATION = 0.125
+TIME_BUDGETS = {
+    "small": {
+        "set_name_to_selected": 0.2,
+        "create_collection_structure": 0.5,
+        "save_to_project": 5.0,
+        "model_export_check": 3.0,
+        "headless_check_cached": 0.5,
+        "worklog_parallel": 5.0,
+        "worklog_parallel_lockfile": 10.0,
+        "worklog_coalesced": 1.0,
+    },
+    "medium": {
+        "set_name_to_selected": 0.2,
+        "create_collection_structure": 1.0,
+        "save_to_project": 10.0,
+        "model_export_check": 10.0,
+        "headless_check_cached": 0.5,
+        "worklog_parallel": 5.0,
+        "worklog_parallel_lockfile": 10.0,
+        "worklog_coalesced": 1.0,
+    },
+    "large": {
+        "set_name_to_selected": 0.5,
+        "create_collection_structure": 2.0,
+        "save_to_project": 30.0,
+        "model_export_check": 40.0,
+        "headless_check_cached": 0.5,
+        "worklog_parallel": 5.0,
+        "worklog_parallel_lockfile": 10.0,
+        "worklog_coalesced": 1.0,
+    },
+}
+
+CALIBRATION_REPEAT = 5
+
+WORKLOG_PROCESSES = 8
+WORKLOG_RECORDS = 50
+
+CHUNK_FIXTURE_BYTES = 40 * 1024 * 1024
+CHUNK_INSERT_BYTES = 512 * 1024
+CHUNK_LARGE_BLOCK_BYTES = 24 * 1024 * 1024
+
+
+class E2ERun:
+    """ Collects check failures and step timings of one run. """
+
+    def __init__(self, size):
+        self.size = size
+        self.failures = []
+        self.timings = {}
+
+    def check(self, condition, message):
+        if not condition:
+            self.failures.append(f"{self.size}: {message}")
+            print(f"[e2e] FAIL {self.size}: {message}")
+        return condition
+
+    def step(self, name, func):
+        """ Run func, record its duration and turn an operator error into a failure. """
+        start = time.perf_counter()
+        try:
+            result = func()
+        except RuntimeError as e:
+            # 背景模式下 operator 回報 ERROR 會變成 RuntimeError
+            self.check(False, f"{name} raised: {e}")
+            result = None
+        self.timings[name] = time.perf_counter() - start
+        print(f"[e2e] {self.size:<6} {name:<32} {self.timings[name] * 1000:10.1f} ms")
+        return result
+
+
+# ----------------------------
+# Fixture
+# ----------------------------
+
+def make_project(parent=None):
+    """ Temporary project root holding the default project.toml marker. """
+    root = tempfile.mkdtemp(prefix="xst_e2e_", dir=parent)
+    project.ensure_project_marker(root)
+    return root
+
+
+def _quad_mesh(name):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [], [(0, 1, 2, 3)])
+    return mesh
+
+
+def _start_scene(asset_name):
+    """ Empty scene with only the GEO- object set_name_to_selected reads the name from. """
+    bpy.ops.wm.read_homefile(use_empty=True)
+    bench.wipe_data()
+    for text in list(bpy.data.texts):
+        bpy.data.texts.remove(text)
+    xst_log_state(bpy.context).entries.clear()
+
+    context = bpy.context
+    obj = bpy.data.objects.new(f"GEO-{asset_name}", _quad_mesh(f"GEO-{asset_name}"))
+    context.scene.collection.objects.link(obj)
+    context.view_layer.objects.active = obj
+    obj.select_set(True)
+    context.scene.xst_asset_panel_props.asset_type = E2E_ASSET_TYPE
+    return obj
+
+
+def _populate(params, asset_name):
+    """ Asset content the export check has to sort out: geometry, rig, helper / widget / scatter collections. """
+    scene_col = bpy.context.scene.collection
+    top = scene_col.children[f"6_{E2E_ASSET_TYPE}_{asset_name}"]
+    rig = top.children[f"RIG_{asset_name}"]
+    helpers = rig.children[f"HLPS_{asset_name}"]
+    widgets = ensure_child_collection(top, f"WGTS_{asset_name}")
+    scatter = ensure_child_collection(top, "Geo-Scatter")
+    ensure_child_collection(scatter, "Geo-Scatter Geonode")
+    scatter_layer = ensure_child_collection(scatter, f"Geo-Scatter {asset_name}_scatter")
+
+    bench.populate_asset(
+        top, rig, asset_name,
+        params["depth"], params["fanout"], params["objects"],
+        params["shared_meshes"], params["materials"], params["bones"],
+    )
+
+    for col, label in ((helpers, "helper"), (widgets, "widget"), (scatter_layer, "scatter")):
+        col.objects.link(bpy.data.objects.new(f"{label}_{asset_name}", _quad_mesh(f"{label}_{asset_name}")))
+
+    # 沒有材質的物件，檢查後應該剛好產生一筆 WARNING
+    no_material = bpy.data.objects.new(f"GEO-{asset_name}_no_material", _quad_mesh(f"GEO-{asset_name}_no_material"))
+    top.objects.link(no_material)
+    return no_material
+
+
+# ----------------------------
+# Checks
+# ----------------------------
+
+def _check_layout(run, asset_name):
+    scene_col = bpy.context.scene.collection
+    top = scene_col.children.get(f"6_{E2E_ASSET_TYPE}_{asset_name}")
+    tmp = scene_col.children.get("TMP")
+    run.check(top is not None, f"6_{E2E_ASSET_TYPE}_{asset_name} not linked to the scene collection")
+    run.check(tmp is not None, "TMP not linked to the scene collection")
+    if not top or not tmp:
+        return
+
+    rig = top.children.get(f"RIG_{asset_name}")
+    run.check(rig is not None, f"RIG_{asset_name} missing under {top.name}")
+    run.check(rig is not None and f"HLPS_{asset_name}" in rig.children, f"HLPS_{asset_name} missing under RIG_{asset_name}")
+    meta = tmp.children.get("META")
+    run.check(meta is not None and meta.color_tag == "COLOR_01", "META missing under TMP or not tagged red")
+    run.check("_delete" in tmp.children, "_delete missing under TMP")
+    run.check(
+        not any(col.name[-4:-3] == "." and col.name[-3:].isdigit() for col in bpy.data.collections),
+        "duplicate .001 collections created",
+    )
+    run.check(
+        bpy.context.scene.xst_asset_panel_props.file_name == build_default_blend_name(E2E_ASSET_TYPE, asset_name),
+        "file_name not set to the default blend name",
+    )
+
+
+def _check_saved(run, root, asset_name, versions):
+    config = project.load_project_config(root)
+    work_dir = config.work_dir(E2E_ASSET_TYPE, asset_name)
+    expected_path = os.path.join(work_dir, versions[-1])
+
+    run.check(os.path.isfile(os.path.join(root, project.PROJECT_MARKER)), "project.toml missing")
+    run.check(os.path.isfile(expected_path), f"{expected_path} not written")
+    run.check(os.path.normpath(bpy.data.filepath) == os.path.normpath(expected_path), "open file is not the saved version")
+
+    entries = read_work_version_log(config.version_log_path(E2E_ASSET_TYPE, asset_name))
+    run.check(len(entries) == len(versions), f"work_version_log has {len(entries)} records, expected {len(versions)}")
+    for entry, file_name in zip(entries, versions):
+        run.check(entry.get("Asset") == f"{E2E_ASSET_TYPE}_{asset_name}", f"log Asset is {entry.get('Asset')!r}")
+        run.check(entry.get("Version") == file_name.split("_")[2], f"log Version is {entry.get('Version')!r}")
+        run.check(
+            os.path.normpath(entry.get("Path", "")) == os.path.join(work_dir, file_name),
+            f"log Path is {entry.get('Path')!r}",
+        )
+        run.check(bool(entry.get("User")) and bool(entry.get("Time")), "log record without User / Time")
+
+
+def _check_visibility(run, asset_name, no_material):
+    context = bpy.context
+    scene_col = context.scene.collection
+    root_layer = context.view_layer.layer_collection
+    top = scene_col.children[f"6_{E2E_ASSET_TYPE}_{asset_name}"]
+
+    hidden = {f"HLPS_{asset_name}", f"WGTS_{asset_name}", f"Geo-Scatter {asset_name}_scatter"}
+    for col in top.children_recursive:
+        layer = find_layer_collection(root_layer, col)
+        if col.name in hidden:
+            run.check(layer.exclude and col.hide_viewport and col.hide_render, f"{col.name} not hidden")
+        else:
+            run.check(not layer.exclude and not col.hide_viewport, f"{col.name} not visible")
+
+    for obj in scene_col.objects:
+        run.check(obj.hide_viewport and obj.hide_render, f"scene root object {obj.name} not hidden")
+
+    state = xst_log_state(context)
+    run.check(state.error_count == 0, f"{state.error_count} errors in the Debug Log")
+    warned = [entry.message for entry in state.entries if entry.level == "WARNING"]
+    run.check(
+        len(warned) == 1 and warned[0] == "Mesh has no material slots",
+        f"expected one material warning for {no_material.name}, got {warned}",
+    )
+
+
+
+def _check_headless_check(run):
+    """ A second headless check of an unchanged file must come from the file-level cache. """
+    bpy.ops.wm.save_mainfile()
+    args = argparse.Namespace(files=[bpy.data.filepath])
+    run.step("headless_check", lambda: validation.headless_check(args))
+    # 檢查只改記憶體內的顯示設定；還原後檔案與磁碟一致才能用快取
+    bpy.ops.wm.revert_mainfile()
+    run.check(validation.cached_file_check(bpy.data.filepath) is not None, "check result not cached")
+    run.step("headless_check_cached", lambda: validation.headless_check(args))
+
+
+def _check_scatter_names(run, asset_name):
+    """ normalize_names must leave the Geo-Scatter collections and their objects as Geo-Scatter named them. """
+    expected_collections = {"Geo-Scatter", "Geo-Scatter Geonode", f"Geo-Scatter {asset_name}_scatter"}
+    found = {col.name for col in bpy.data.collections if col.name.startswith("Geo-Scatter")}
+    run.check(found == expected_collections, f"Geo-Scatter collections renamed: {sorted(found)}")
+    run.check(f"scatter_{asset_name}" in bpy.data.objects, f"Geo-Scatter object scatter_{asset_name} renamed")
+
+
+# 獨立 Python 行程只載入 worklog.py（不需要 bpy），模擬多台機器同時寫入
+_WORKLOG_WRITER = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("worklog", sys.argv[1])
+worklog = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(worklog)
+writer, count, log_path = sys.argv[2], int(sys.argv[3]), sys.argv[4]
+for i in range(count):
+    worklog.append_record(log_path, "-" * 60 + f"\\nUser    : {writer}\\nIndex   : {i}\\nPath    : {'x' * 4000}\\n" + "-" * 60 + "\\n\\n")
+"""
+
+
+def _run_worklog_writers(log_path, lockfile):
+    env = dict(os.environ, XST_LOG_LOCKFILE="1" if lockfile else "0")
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", _WORKLOG_WRITER, worklog.__file__, f"writer{i}", str(WORKLOG_RECORDS), log_path],
+            env=env,
+        )
+        for i in range(WORKLOG_PROCESSES)
+    ]
+    return [proc.wait() for proc in procs]
+
+
+def _check_worklog_records(run, log_path, label):
+    entries = read_work_version_log(log_path)
+    expected = WORKLOG_PROCESSES * WORKLOG_RECORDS
+    run.check(len(entries) == expected, f"{label}: {len(entries)} records, expected {expected}")
+    counts = {}
+    for entry in entries:
+        counts[entry.get("User")] = counts.get(entry.get("User"), 0) + 1
+    run.check(
+        all(len(entry) == 3 and len(entry.get("Path", "")) == 4000 for entry in entries)
+        and all(count == WORKLOG_RECORDS for count in counts.values()),
+        f"{label}: interleaved or lost records",
+    )
+
+
+def _check_parallel_worklog(run, directory):
+    """
+    Many writer processes on one log, with the advisory lock and with the
+    lock-file fallback (starting from a stale lock file): every record must
+    come back whole. A coalesced burst must land in one write.
+    """
+    for lockfile in (False, True):
+        label = "worklog_parallel_lockfile" if lockfile else "worklog_parallel"
+        log_path = os.path.join(directory, f"{label}.txt")
+        if lockfile:
+            # 當掉的持有者留下的 lock file，寫入者要能自行清掉
+            with open(log_path + ".lock", "w", encoding="utf-8") as f:
+                f.write("crashed-host 1 0\n")
+            stale = time.time() - worklog.STALE_LOCK_SECONDS - 60
+            os.utime(log_path + ".lock", (stale, stale))
+        codes = run.step(label, lambda log_path=log_path, lockfile=lockfile: _run_worklog_writers(log_path, lockfile))
+        run.check(codes is not None and not any(codes), f"{label}: writer processes failed: {codes}")
+        run.check(not os.path.exists(log_path + ".lock"), f"{label}: lock file left behind")
+        _check_worklog_records(run, log_path, label)
+
+    file_path = os.path.join(directory, build_default_blend_name(E2E_ASSET_TYPE, E2E_ASSET_NAME))
+    log_path = os.path.join(directory, "work_version_log.txt")
+
+    def burst():
+        with worklog.coalesce():
+            for _ in range(WORKLOG_RECORDS):
+                write_work_version_log(file_path, E2E_ASSET_TYPE, E2E_ASSET_NAME)
+            run.check(not os.path.exists(log_path), "coalesced records written before the block exited")
+
+    run.step("worklog_coalesced", burst)
+    entries = read_work_version_log(log_path)
+    run.check(
+        len(entries) == WORKLOG_RECORDS and all(entry.get("Version") == "V01" for entry in entries),
+        f"coalesced burst wrote {len(entries)} records, expected {WORKLOG_RECORDS}",
+    )
+
+
+def _synthetic_blend(blocks):
+    # 最小的 .blend 外殼：檔頭 + BHead 區塊 + ENDB
+    endb = struct.pack("<4siQii", b"ENDB", 0, 0, 0, 0)
+    return b"BLENDER-v405" + b"".join(blocks) + endb
+
+
+def _synthetic_block(rnd, code, length):
+    # 同類區塊的檔頭幾乎相同（同一個 sdna、相近的指標），切點只能來自內容
+    return struct.pack("<4siQii", code, length, 0x7F0000000000, 0, 1) + rnd.randbytes(length)
+
+
+def _synthetic_blocks(rnd, code, total, max_size):
+    blocks = []
+    size = 0
+    while size < total:
+        blocks.append(_synthetic_block(rnd, code, rnd.randint(16, max_size)))
+        size += len(blocks[-1])
+    return blocks
+
+
+def _check_chunk_reuse(run, root):
+    """
+    A version with blocks inserted near the start must reuse the chunks after
+    the insertion, and a single block larger than MAX_CHUNK must be split.
+    """
+    rnd = random.Random(0)
+    blocks = _synthetic_blocks(rnd, b"DATA", CHUNK_FIXTURE_BYTES, 16 * 1024)
+    blocks.append(_synthetic_block(rnd, b"DATA", CHUNK_LARGE_BLOCK_BYTES))
+    inserted = _synthetic_blocks(rnd, b"ME\0\0", CHUNK_INSERT_BYTES, 4 * 1024)
+
+    work_dir = os.path.join(root, "work", "char", E2E_ASSET_NAME)
+    os.makedirs(work_dir)
+    paths = [os.path.join(work_dir, f"{E2E_ASSET_TYPE}_{E2E_ASSET_NAME}_V0{i}_mod-B01.blend") for i in (1, 2)]
+    for path, content in zip(paths, (blocks, blocks[:100] + inserted + blocks[100:])):
+        with open(path, "wb") as f:
+            f.write(_synthetic_blend(content))
+
+    manifests = []
+    for path in paths:
+        run.step(f"chunk_ingest_{len(manifests) + 1}", lambda path=path: storage.save_version(path, root))
+        manifests.append(storage.read_manifest(path))
+
+    old, new = ({digest for digest, _ in manifest["chunks"]} for manifest in manifests)
+    run.check(len(old) > 8, f"only {len(old)} chunks for a {CHUNK_FIXTURE_BYTES >> 20} MB file")
+    run.check(len(old & new) >= len(old) - 2, f"only {len(old & new)} of {len(old)} chunks reused after an early insertion")
+    largest = max(size for _, size in manifests[0]["chunks"])
+    run.check(largest <= storage.MAX_CHUNK, f"{largest >> 20} MB chunk: a large block was not split")
+
+
+# ----------------------------
+# Run
+# ----------------------------
+
+def calibrate(repeat=CALIBRATION_REPEAT):
+    """ Seconds (min of repeat) for a fixed interpreter + hashing workload; a measure of machine speed. """
+    data = bytes(range(256)) * 4096
+
+    def workload():
+        total = 0
+        for i in range(1000000):
+            total += i * i % 7
+        for _ in range(64):
+            hashlib.sha256(data).digest()
+
+    return bench.timeit(workload, repeat)["min"]
+
+
+def run_storage(parent=None):
+    result = E2ERun("storage")
+    root = make_project(parent)
+    # 本機快取放在暫存專案內，不動使用者的快取
+    cache_dir = os.environ.get("XST_CHUNK_CACHE")
+    os.environ["XST_CHUNK_CACHE"] = os.path.join(root, "cache")
+    try:
+        _check_chunk_reuse(result, root)
+    finally:
+        if cache_dir is None:
+            del os.environ["XST_CHUNK_CACHE"]
+        else:
+            os.environ["XST_CHUNK_CACHE"] = cache_dir
+    shutil.rmtree(root, ignore_errors=True)
+    return result
+
+
+def run_size(size, parent=None, overrides=None, budget_scale=1.0):
+    params = dict(bench.SIZES[size])
+    params.update(overrides or {})
+    result = E2ERun(size)
+    root = make_project(parent)
+    asset_name = f"{E2E_ASSET_NAME}{size}"
+    ops = bpy.ops.xanthus_studio_tools
+
+    try:
+        _start_scene(asset_name)
+        result.step("set_name_to_selected", ops.set_name_to_selected)
+        result.check(bpy.context.scene.xst_asset_panel_props.asset_name == asset_name, "asset_name not taken from GEO- object")
+
+        result.step("create_collection_structure", ops.create_collection_structure)
+        ops.create_collection_structure()
+        _check_layout(result, asset_name)
+        if result.failures:
+            return result
+
+        no_material = _populate(params, asset_name)
+        result.step("normalize_names", lambda: ops.normalize_names(dry_run=False))
+        _check_scatter_names(result, asset_name)
+
+        props = bpy.context.scene.xst_asset_panel_props
+        versions = [props.file_name]
+        result.step("save_to_project", lambda: ops.save_to_project(directory=root))
+        props.file_name = props.file_name.replace("_V01_", "_V02_")
+        versions.append(props.file_name)
+        ops.save_to_project(directory=root)
+        _check_saved(result, root, asset_name, versions)
+
+        result.step("model_export_check", ops.model_export_check)
+        _check_visibility(result, asset_name, no_material)
+        _check_headless_check(result)
+
+        _check_parallel_worklog(result, tempfile.mkdtemp(prefix="log_", dir=root))
+    finally:
+        project.clear_cache()
+
+    # budget_scale 為 None 時改由 --compare 的比例判斷
+    if budget_scale is not None:
+        for name, seconds in result.timings.items():
+            budget = TIME_BUDGETS[size].get(name)
+            if budget is not None:
+                budget *= budget_scale
+                result.check(seconds <= budget, f"{name} took {seconds:.3f}s, budget {budget:.3f}s")
+
+    if not result.failures:
+        shutil.rmtree(root, ignore_errors=True)
+    else:
+        print(f"[e2e] project kept for inspection: {root}")
+    return result
+
+
+def run(sizes=("small",), overrides=None, use_budgets=True):
+    calibration = calibrate()
+    budget_scale = calibration / REFERENCE_CALIBRATION if use_budgets else None
+    runs = [run_size(size, overrides=overrides, budget_scale=budget_scale) for size in sizes]
+    runs.append(run_storage())
+    report = {
+        "meta": {
+            "sizes": list(sizes),
+            "calibration": calibration,
+            "blender": bpy.app.version_string,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        # 與 bench 相同格式，可直接用 bench.compare 比較
+        "results": {
+            f"{r.size}.{name}": {"median": seconds}
+            for r in runs for name, seconds in r.timings.items()
+        },
+        "failures": [failure for r in runs for failure in r.failures],
+    }
+    return report
+
+
+def headless_e2e(args):
+    overrides = {"objects": args.objects} if args.objects is not None else None
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    report = run(args.sizes, overrides, use_budgets=baseline is None)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = len(report["failures"])
+    if baseline is not None:
+        # 基準在較快 / 較慢的機器上量測時，依兩邊的 calibration 比例修正門檻
+        calibration = report["meta"]["calibration"]
+        speed = calibration / baseline.get("meta", {}).get("calibration", calibration)
+        for name, old, new, ratio in bench.compare(baseline, report, args.threshold * speed):
+            print(f"[e2e] REGRESSION {name}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms (x{ratio:.2f})")
+            failed += 1
+
+    print(f"[e2e] {'FAILED' if failed else 'OK'}: {failed} failures")
+    return 1 if failed else 0
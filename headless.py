@@ -0,0 +1,108 @@
+"""
+Headless entry point for pipeline tools.
+
+    blender -b [file.blend] --python <add-on dir>/headless.py -- <command> [options]
+
+Commands:
+    publish [files ...] [--formats FBX GLTF USD] [--jobs N] [--force]
+    check [files ...]
+    diff old.blend new.blend
+    summarize --output summary.json
+    bench [--suite all|scene|pure] [--size small|medium|large] [--output results.json]
+          [--compare baseline.json] [--threshold 1.25]
+    e2e [--sizes small medium large] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import importlib
+import os
+import sys
+
+import bpy
+
+ADDON_ID = "xanthus_studio_tools"
+
+
+def _import_addon():
+    """ The add-on package, whether it is enabled in preferences or only on disk next to this script. """
+    if __package__:
+        return importlib.import_module(__package__)
+
+    for name in bpy.context.preferences.addons.keys():
+        if name.rsplit(".", 1)[-1] == ADDON_ID:
+            return importlib.import_module(name)
+
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_dir))
+    addon = importlib.import_module(os.path.basename(addon_dir))
+    addon.register()
+    return addon
+
+
+def _submodule(addon, name):
+    # Tool modules that are not registered with the add-on are imported on demand
+    return importlib.import_module(f"{addon.__name__}.{name}")
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(prog="headless.py")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    publish = sub.add_parser("publish", help="export the asset collection to publish/")
+    publish.add_argument("files", nargs="*", help=".blend files; defaults to the open file")
+    publish.add_argument("--formats", nargs="+", default=["FBX"], choices=["FBX", "GLTF", "USD", "fbx", "gltf", "usd"])
+    publish.add_argument("--jobs", type=int, default=None)
+    publish.add_argument("--force", action="store_true")
+
+    check = sub.add_parser("check", help="run model_export_check on files changed since their last check")
+    check.add_argument("files", nargs="*", help=".blend files; defaults to the open file")
+
+    diff = sub.add_parser("diff", help="compare the datablock summaries of two versions")
+    diff.add_argument("old")
+    diff.add_argument("new")
+
+    summarize = sub.add_parser("summarize", help="write the datablock summary of the open file")
+    summarize.add_argument("--output", required=True)
+
+    bench = sub.add_parser("bench", help="run benchmarks on a synthetic scene")
+    bench.add_argument("--suite", default="all", choices=["all", "scene", "pure"])
+    bench.add_argument("--size", default="small", choices=["small", "medium", "large"])
+    bench.add_argument("--repeat", type=int, default=5)
+    bench.add_argument("--output", default="")
+    bench.add_argument("--compare", default="", help="baseline JSON; exit 1 on regressions")
+    bench.add_argument("--threshold", type=float, default=1.25)
+    for key in ("depth", "fanout", "objects", "shared_meshes", "materials", "bones", "log_entries"):
+        bench.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int, default=None)
+
+    e2e = sub.add_parser("e2e", help="run the pipeline operators end to end on a mock project")
+    e2e.add_argument("--sizes", nargs="+", default=["small"], choices=["small", "medium", "large"])
+    e2e.add_argument("--objects", type=int, default=None, help="override the fixture object count")
+    e2e.add_argument("--output", default="")
+    e2e.add_argument("--compare", default="", help="baseline JSON; exit 1 on regressions")
+    e2e.add_argument("--threshold", type=float, default=1.5)
+
+    return parser
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = _build_parser().parse_args(argv)
+    addon = _import_addon()
+
+    if args.command == "publish":
+        return addon.publish.headless_publish(args)
+    if args.command == "check":
+        return addon.validation.headless_check(args)
+    if args.command == "diff":
+        return addon.diff.headless_diff(args)
+    if args.command == "summarize":
+        return addon.diff.headless_summarize(args)
+    if args.command == "bench":
+        return _submodule(addon, "bench").headless_bench(args)
+    if args.command == "e2e":
+        return _submodule(addon, "e2e").headless_e2e(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import bpy
+import re
+from bpy.types import Operator
+from bpy.props import BoolProperty
+from .project import project_for_file, DEFAULT_NAMING
+from .trobleshooting import XST_Logger
+from .utils import get_prefix, parse_asset_from_filepath
+from .validation import source_library
+
+# Blender 自動加的 .001 與大小寫錯誤的前綴都視為需要整理
+NUMBER_SUFFIX = re.compile(r"\.\d{3,}$")
+COLLECTION_PREFIXES = ("RIG", "HLPS", "WGTS", "HIDE")
+TEMP_NAME = "__xst_rename_{:06d}"
+
+
+def _strip_prefix(name, prefix):
+    # 'geo-', 'GEO_', 'Geo-' 等都去掉，保留後面的名稱
+    stem = prefix.rstrip("-_").lower()
+    lowered = name.lower()
+    for sep in ("-", "_"):
+        if lowered.startswith(stem + sep):
+            return name[len(stem) + 1:]
+    return name
+
+
+def _clean(name):
+    name = NUMBER_SUFFIX.sub("", name.strip())
+    return re.sub(r"\s+", "_", name)
+
+
+def normalized_object_name(obj, naming, asset_name, is_main_rig):
+    base = _clean(obj.name)
+    if obj.type == "MESH":
+        return naming["geo_prefix"] + _strip_prefix(base, naming["geo_prefix"])
+    if obj.type == "ARMATURE":
+        if is_main_rig:
+            return naming["rig_prefix"] + asset_name
+        return naming["rig_prefix"] + _strip_prefix(base, naming["rig_prefix"])
+    return base
+
+
+def normalized_collection_name(col):
+    base = _clean(col.name)
+    prefix = get_prefix(base)
+    if prefix and prefix.upper() in COLLECTION_PREFIXES:
+        return prefix.upper() + base[len(prefix):]
+    return base
+
+
+def _unique(name, taken):
+    # 用 _01, _02 取代 Blender 的 .001
+    if name not in taken:
+        return name
+    index = 1
+    while f"{name}_{index:02d}" in taken:
+        index += 1
+    return f"{name}_{index:02d}"
+
+
+def plan_renames(asset_col, asset_name, naming):
+    """
+    Every rename needed under asset_col as [(datablock, old name, new name)],
+    with collisions already resolved against all other names in the file.
+    """
+    hide_prefixes = set(naming["hide_collection_prefixes"])
+    wanted = []
+
+    # Geo-Scatter 的 collection 與物件名稱由 Geo-Scatter 管理，整個略過
+    scatter_collections = set()
+    scatter_objects = set()
+    for col in asset_col.children_recursive:
+        if col.name.startswith("Geo-Scatter"):
+            scatter_collections.add(col.session_uid)
+            scatter_collections.update(child.session_uid for child in col.children_recursive)
+            scatter_objects.update(obj.session_uid for obj in col.all_objects)
+    collections = [
+        col for col in asset_col.children_recursive
+        if col.session_uid not in scatter_collections and source_library(col) is None
+    ]
+    for col in collections:
+        wanted.append((col, normalized_collection_name(col)))
+
+    # helper / widget collection 裡的物件不套 GEO-/RIG- 規則
+    helper_objects = set()
+    for col in collections:
+        if get_prefix(col.name.upper()) in hide_prefixes:
+            helper_objects.update(obj.session_uid for obj in col.all_objects)
+
+    armatures = [obj for obj in asset_col.all_objects if obj.type == "ARMATURE" and source_library(obj) is None]
+    main_rig = armatures[0] if len(armatures) == 1 else None
+
+    for obj in asset_col.all_objects:
+        if source_library(obj) is not None or obj.session_uid in scatter_objects:
+            continue
+        if obj.session_uid in helper_objects:
+            wanted.append((obj, _clean(obj.name)))
+        else:
+            wanted.append((obj, normalized_object_name(obj, naming, asset_name, obj == main_rig)))
+
+    renamed_uids = {id_data.session_uid for id_data, new in wanted if new != id_data.name}
+    taken = {
+        "objects": {obj.name for obj in bpy.data.objects if obj.library is None and obj.session_uid not in renamed_uids},
+        "collections": {col.name for col in bpy.data.collections if col.library is None and col.session_uid not in renamed_uids},
+    }
+
+    plan = []
+    for id_data, new in wanted:
+        if new == id_data.name:
+            continue
+        names = taken["objects"] if isinstance(id_data, bpy.types.Object) else taken["collections"]
+        new = _unique(new, names)
+        names.add(new)
+        if new != id_data.name:
+            plan.append((id_data, id_data.name, new))
+    return plan
+
+
+def apply_renames(plan):
+    """
+    Rename in two passes: first to unique temporary names, then to the final
+    names, so no final name is ever held by another datablock of the plan.
+    """
+    for index, (id_data, _, _) in enumerate(plan):
+        id_data.name = TEMP_NAME.format(index)
+    for id_data, _, new in plan:
+        id_data.name = new
+
+
+class XST_OT_normalize_names(Operator):
+    bl_idname = "xanthus_studio_tools.normalize_names"
+    bl_label = "整理命名"
+    bl_options = {"REGISTER", "UNDO"}
+
+    dry_run: BoolProperty(
+        name="只預覽",
+        description="只把預計的改名寫入 Debug Log，不實際改名",
+        default=True,
+    ) # type: ignore
+
+    def execute(self, context):
+        props = context.scene.xst_asset_panel_props
+        asset = parse_asset_from_filepath(bpy.data.filepath) if bpy.data.filepath else None
+        asset_type, asset_name = asset if asset else (props.asset_type, props.asset_name.strip())
+
+        asset_col = context.scene.collection.children.get(f"6_{asset_type}_{asset_name}")
+        if not asset_col:
+            self.report({"ERROR"}, f"找不到 Collection: 6_{asset_type}_{asset_name}")
+            return {"CANCELLED"}
+
+        project = project_for_file(bpy.data.filepath)
+        naming = project.naming if project else DEFAULT_NAMING
+
+        plan = plan_renames(asset_col, asset_name, naming)
+
+        logger = XST_Logger(context)
+        logger.clear()
+        for id_data, old, new in plan:
+            is_object = isinstance(id_data, bpy.types.Object)
+            logger.log(
+                f"Rename: {old} -> {new}",
+                details="planned" if self.dry_run else "renamed",
+                level="INFO",
+                target_type="OBJECT" if is_object else "NONE",
+                target_object=id_data if is_object else None,
+                target_label=new,
+            )
+
+        if not self.dry_run:
+            apply_renames(plan)
+
+        self.report({"INFO"}, f"{'預計' if self.dry_run else '已'}改名 {len(plan)} 個")
+        return {"FINISHED"}
+
+
+classes = (
+    XST_OT_normalize_names,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -1,15 +1,21 @@
 import bpy
 import os
+from bpy.app.handlers import persistent
 from bpy.types import Operator
-from bpy.props import StringProperty
+from bpy.props import StringProperty, EnumProperty, BoolProperty
+from . import storage, validation
+from .project import project_for_file, ensure_project_marker
 from .trobleshooting import XST_Logger
 from .utils import (
     ensure_child_collection,
     parse_name_from_geo,
     build_default_blend_name,
     write_work_version_log,
+    work_version_enum_items,
     get_prefix,
     find_layer_collection,
+    get_addon_preferences,
+    parse_asset_from_filepath,
 )
 
 class XST_OT_save_to_project(Operator):
@@ -18,7 +24,20 @@ class XST_OT_save_to_project(Operator):
 
     directory: StringProperty(subtype="DIR_PATH")
 
+    browse: BoolProperty(
+        name="選擇專案路徑",
+        description="即使目前檔案已在專案內，也開啟檔案瀏覽器選擇專案",
+        default=False,
+        options={"SKIP_SAVE"},
+    ) # type: ignore
+
     def invoke(self, context, event):
+        # 目前檔案已在專案內（找得到 project.toml）時直接存，不再詢問路徑
+        project = None if self.browse else project_for_file(bpy.data.filepath)
+        if project:
+            self.directory = project.root
+            return self.execute(context)
+
         context.window_manager.fileselect_add(self)
         return {"RUNNING_MODAL"}
 
@@ -38,29 +57,60 @@ class XST_OT_save_to_project(Operator):
         if not file_name.lower().endswith(".blend"):
             file_name += ".blend"
 
-        type_map = {
-            "CH": os.path.join("work", "char"),
-            "PR": os.path.join("work", "prop"),
-            "SE": os.path.join("work", "set"),
-        }
-
         project_root = bpy.path.abspath(self.directory)
-        target_dir = os.path.join(project_root, type_map[props.asset_type], name)
+        project = ensure_project_marker(project_root)
+        target_dir = project.work_dir(props.asset_type, name)
         os.makedirs(target_dir, exist_ok=True)
 
         target_path = os.path.join(target_dir, file_name)
         bpy.ops.wm.save_as_mainfile(filepath=target_path)
 
+        # 去重儲存：切塊存入專案 chunk store，久未修改且沒被連結的舊版本只保留 manifest
+        manifest_path = None
+        prefs = get_addon_preferences(context)
+        if prefs and prefs.dedup_storage:
+            manifest_path = storage.save_version(target_path, project_root)
+            storage.dehydrate_versions(target_dir, keep=[target_path])
+
         # 寫入 work_version_log.txt
         write_work_version_log(
             file_path=target_path,
             asset_type=props.asset_type,
             asset_name=name,
+            manifest_path=manifest_path,
         )
 
         self.report({"INFO"}, "已另存並寫入版本紀錄")
         return {"FINISHED"}
 
+class XST_OT_open_work_version(Operator):
+    bl_idname = "xanthus_studio_tools.open_work_version"
+    bl_label = "開啟工作版本"
+
+    version: EnumProperty(
+        name="版本",
+        items=work_version_enum_items,
+    ) # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        path = self.version
+        if not path or path == "NONE":
+            self.report({"ERROR"}, "沒有可開啟的版本")
+            return {"CANCELLED"}
+
+        # 只剩 manifest 的版本先從 chunk store 還原
+        try:
+            storage.ensure_version_file(path)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({"ERROR"}, f"無法還原版本：{e}")
+            return {"CANCELLED"}
+
+        bpy.ops.wm.open_mainfile(filepath=path)
+        return {"FINISHED"}
+
 class XST_OT_create_structure(Operator):
     bl_idname = "xanthus_studio_tools.create_collection_structure"
     bl_label = "建立架構"
@@ -182,7 +232,6 @@ class XST_OT_model_export_check(bpy.types.Operator):
         scene = context.scene
         scene_root = scene.collection  # Scene Collection
         root_layer_collection = context.view_layer.layer_collection
-        hide_collection_prefix = ["WGTS", "HLPS", "HIDE"]
         hide_collection_list = []
         logger = XST_Logger(context)
 
@@ -199,14 +248,18 @@ class XST_OT_model_export_check(bpy.types.Operator):
                 level="ERROR",
             )
             return {"CANCELLED"}
-        base = os.path.basename(filepath)
-        parts = base.split("_")
-        if len(parts) < 2:
+        asset = parse_asset_from_filepath(filepath)
+        if not asset:
             self.report({"ERROR"}, "檔名格式錯誤，無法解析名稱與類型")
             return {"CANCELLED"}
-        asset_type = parts[0]
-        asset_name = parts[1]
+        asset_type, asset_name = asset
+
+        project = project_for_file(filepath)
         
+        hide_collection_prefix = (
+            project.naming["hide_collection_prefixes"] if project else ["WGTS", "HLPS", "HIDE"]
+        )
+
         model_col_name = f"6_{asset_type}_{asset_name}"
         model_col = scene_root.children.get(model_col_name)
         if not model_col:
@@ -214,6 +267,23 @@ class XST_OT_model_export_check(bpy.types.Operator):
             return {"CANCELLED"}
 
 
+        # 要輸出的物件（不含被隱藏的 collection），供後續逐物件檢查
+        # 連結的物件與 library override 依來源 library 分組，每個 library 檔只檢查一次；
+        # override 是本地資料，顯示設定仍可在本檔覆寫
+        export_objects = {}
+        linked_objects = {}
+
+        def add_export_object(obj):
+            library = validation.source_library(obj)
+            if library:
+                linked_objects.setdefault(library, {})[obj.name] = obj
+            else:
+                export_objects[obj.name] = obj
+            return obj.library is None
+
+        for obj in model_col.objects:
+            add_export_object(obj)
+
         # Iterate through all child collections recursively and hide/unhide based on rules
         for col in model_col.children_recursive:
             # Recursively find the correct LayerCollection
@@ -223,14 +293,18 @@ class XST_OT_model_export_check(bpy.types.Operator):
                 self.report({"WARNING"}, f"找不到 {col.name} 的 LayerCollection")
                 continue
 
+            # 直接連結的 collection 無法修改本身的顯示設定，只調整 LayerCollection
+            is_linked = col.library is not None
+
             # 隱藏 collections based on prefix
             if get_prefix(col.name) in hide_collection_prefix:
                 layer_collection.exclude = True
                 layer_collection.hide_viewport = True
 
-                col.hide_viewport = True
-                col.hide_render = True
-                col.hide_select = True
+                if not is_linked:
+                    col.hide_viewport = True
+                    col.hide_render = True
+                    col.hide_select = True
 
                 hide_collection_list.append(col.name)
 
@@ -244,9 +318,10 @@ class XST_OT_model_export_check(bpy.types.Operator):
                 layer_collection.exclude = True
                 layer_collection.hide_viewport = True
 
-                col.hide_viewport = True
-                col.hide_render = True
-                col.hide_select = True
+                if not is_linked:
+                    col.hide_viewport = True
+                    col.hide_render = True
+                    col.hide_select = True
 
                 hide_collection_list.append(col.name)
 
@@ -256,14 +331,15 @@ class XST_OT_model_export_check(bpy.types.Operator):
             layer_collection.exclude = False
             layer_collection.hide_viewport = False
 
-            col.hide_viewport = False
-            col.hide_render = False
-            col.hide_select = False
+            if not is_linked:
+                col.hide_viewport = False
+                col.hide_render = False
+                col.hide_select = False
 
             for obj in col.objects:
-                obj.hide_viewport = False
-                obj.hide_render = False
-                col.hide_select = False
+                if add_export_object(obj):
+                    obj.hide_viewport = False
+                    obj.hide_render = False
 
         self.report({"INFO"}, f"隱藏的 Collection: {', '.join(hide_collection_list)}")
 
@@ -274,6 +350,44 @@ class XST_OT_model_export_check(bpy.types.Operator):
 
         self.report({"INFO"}, "模型匯出顯示完成")
 
+        findings = validation.validate_objects(export_objects.values())
+        for obj_name, obj_findings in findings.items():
+            obj = export_objects[obj_name]
+            for level, message, details in obj_findings:
+                logger.log(
+                    message,
+                    details=details,
+                    level=level,
+                    target_type="OBJECT",
+                    target_object=obj,
+                    target_label=obj.name,
+                )
+
+        # 連結的 library：依 (路徑, mtime) 快取結果，只彙整成一筆 log
+        for library, objects in linked_objects.items():
+            lib_findings, cached = validation.validate_library(library, objects.values())
+            if lib_findings is None:
+                logger.log(
+                    f"找不到連結檔案：{library.name}",
+                    details=library.filepath,
+                    level="ERROR",
+                    target_label=library.name,
+                )
+                continue
+
+            flat = [
+                (level, f"{obj_name}: {message}")
+                for obj_name, obj_findings in lib_findings.items()
+                for level, message, _ in obj_findings
+            ]
+            level = "ERROR" if any(l == "ERROR" for l, _ in flat) else ("WARNING" if flat else "INFO")
+            logger.log(
+                f"Linked library {library.name}: {len(objects)} objects, {len(flat)} findings"
+                + (" (cached)" if cached else ""),
+                details="\n".join(text for _, text in flat[:20]),
+                level=level,
+                target_label=library.name,
+            )
         
 
 
@@ -305,17 +419,33 @@ class XST_OT_texture_export_check(bpy.types.Operator):
 
 classes = (
     XST_OT_save_to_project,
+    XST_OT_open_work_version,
     XST_OT_create_structure,
     XST_OT_set_name_to_selected,
     XST_OT_load_armature_by_name,
     XST_OT_model_export_check,
 )
 
+@persistent
+def _on_save_post(*args):
+    # 記錄這個檔案連結了哪些 .blend，去重儲存不會移除被連結的版本
+    project = project_for_file(bpy.data.filepath)
+    if not project:
+        return
+    library_paths = [bpy.path.abspath(lib.filepath) for lib in bpy.data.libraries]
+    try:
+        storage.record_library_refs(bpy.data.filepath, project.root, library_paths)
+    except OSError as e:
+        print(f"⚠️ 無法記錄連結檔案：{e}")
+
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    bpy.app.handlers.save_post.append(_on_save_post)
 
 def unregister():
+    if _on_save_post in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.remove(_on_save_post)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
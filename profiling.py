@@ -0,0 +1,175 @@
+import bpy
+import os
+import time
+import cProfile
+import tempfile
+from datetime import datetime
+from bpy.types import Operator, Panel
+from .utils import get_addon_preferences
+
+OPERATOR_PREFIXES = ("xanthus_studio_tools.", "xst.")
+TOP_CALLS = 15
+
+# ----------------------------
+# Execute wrappers
+# ----------------------------
+# 關閉時把原本的 execute 放回 class，不留任何 wrapper（零額外開銷）
+
+_originals = {}   # operator class -> original execute
+_stats = {}       # bl_idname -> [calls, total seconds, max seconds]
+_last_profile = ""
+
+
+def _operator_classes():
+    found = []
+    stack = list(bpy.types.Operator.__subclasses__())
+    while stack:
+        cls = stack.pop()
+        stack.extend(cls.__subclasses__())
+        if getattr(cls, "bl_idname", "").startswith(OPERATOR_PREFIXES) and "execute" in cls.__dict__:
+            found.append(cls)
+    return found
+
+
+def _profile_path(idname):
+    directory = os.path.dirname(bpy.data.filepath) if bpy.data.filepath else tempfile.gettempdir()
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return os.path.join(directory, f"xst_profile_{idname.replace('.', '_')}_{stamp}.prof")
+
+
+def _record(idname, elapsed):
+    entry = _stats.get(idname)
+    if entry is None:
+        _stats[idname] = [1, elapsed, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+
+def _timing_wrapper(idname, execute):
+    def execute_timed(self, context):
+        start = time.perf_counter()
+        try:
+            return execute(self, context)
+        finally:
+            _record(idname, time.perf_counter() - start)
+    return execute_timed
+
+
+def _cprofile_wrapper(idname, execute):
+    def execute_profiled(self, context):
+        global _last_profile
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return execute(self, context)
+        finally:
+            profile.disable()
+            _record(idname, time.perf_counter() - start)
+            try:
+                _last_profile = _profile_path(idname)
+                profile.dump_stats(_last_profile)
+            except OSError as e:
+                print(f"⚠️ 無法寫入 profile：{e}")
+    return execute_profiled
+
+
+def remove_wrappers():
+    for cls, execute in _originals.items():
+        cls.execute = execute
+    _originals.clear()
+
+
+def apply_profiling(mode):
+    """ Install (TIMING / CPROFILE) or remove (OFF) the execute wrappers. """
+    remove_wrappers()
+    if mode == "OFF":
+        return
+
+    make_wrapper = _cprofile_wrapper if mode == "CPROFILE" else _timing_wrapper
+    for cls in _operator_classes():
+        _originals[cls] = cls.execute
+        cls.execute = make_wrapper(cls.bl_idname, cls.execute)
+
+
+def on_profiling_mode_changed(self, context):
+    apply_profiling(self.profiling_mode)
+
+
+def slowest_calls(limit=TOP_CALLS):
+    """ [(bl_idname, calls, total, max)] sorted by total time. """
+    rows = [(idname, calls, total, peak) for idname, (calls, total, peak) in _stats.items()]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
+
+
+# ----------------------------
+# Operator + Panel
+# ----------------------------
+
+class XST_OT_profile_reset(Operator):
+    bl_idname = "xst.profile_reset"
+    bl_label = "Reset Profiling Stats"
+
+    def execute(self, context):
+        _stats.clear()
+        return {"FINISHED"}
+
+
+class XST_PT_profile(Panel):
+    bl_label = "Profiling"
+    bl_idname = "XST_PT_profile"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Xanthus Tools"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    @classmethod
+    def poll(cls, context):
+        prefs = get_addon_preferences(context)
+        return bool(prefs and prefs.profiling_mode != "OFF")
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.label(text=get_addon_preferences(context).profiling_mode, icon="TIME")
+        row.operator("xst.profile_reset", text="", icon="TRASH")
+
+        rows = slowest_calls()
+        if not rows:
+            layout.label(text="No calls recorded yet", icon="INFO")
+            return
+
+        col = layout.column(align=True)
+        for idname, calls, total, peak in rows:
+            line = col.row(align=True)
+            line.label(text=idname)
+            line.label(text=f"x{calls}")
+            line.label(text=f"{total * 1000 / calls:.1f} ms avg")
+            line.label(text=f"{peak * 1000:.1f} ms max")
+
+        if _last_profile:
+            layout.label(text=os.path.basename(_last_profile), icon="FILE")
+
+
+classes = (
+    XST_OT_profile_reset,
+    XST_PT_profile,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+    prefs = get_addon_preferences()
+    if prefs:
+        apply_profiling(prefs.profiling_mode)
+
+def unregister():
+    remove_wrappers()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
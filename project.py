@@ -0,0 +1,149 @@
+"""
+Project-root discovery and per-project config.
+
+A project is the directory that holds a 'project.toml' marker. The root is
+found by walking up from a file; every directory visited on the way is
+cached, so batch tools resolve thousands of files with one walk per tree.
+"""
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+PROJECT_MARKER = "project.toml"
+
+DEFAULT_FOLDERS = {
+    "CH": "char",
+    "PR": "prop",
+    "SE": "set",
+}
+
+DEFAULT_NAMING = {
+    "geo_prefix": "GEO-",
+    "rig_prefix": "RIG-",
+    "rig_collection_prefix": "RIG_",
+    "helper_collection_prefix": "HLPS_",
+    "hide_collection_prefixes": ["WGTS", "HLPS", "HIDE"],
+}
+
+DEFAULT_MARKER_TEXT = """# Xanthus Studio project marker
+[folders]
+CH = "char"
+PR = "prop"
+SE = "set"
+
+# [budgets.CH]
+# max_triangles = 100000
+# max_texture_mb = 256
+# max_objects = 200
+"""
+
+_root_cache = {}     # directory -> project root（找不到的結果不快取，之後建立的專案才找得到）
+_config_cache = {}   # project root -> (marker mtime_ns, ProjectConfig)
+
+
+class ProjectConfig:
+    def __init__(self, root, data=None):
+        data = data or {}
+        self.root = root
+        self.folders = dict(DEFAULT_FOLDERS, **data.get("folders", {}))
+        self.naming = dict(DEFAULT_NAMING, **data.get("naming", {}))
+        self.budgets = data.get("budgets", {})
+
+    def _asset_dir(self, area, asset_type, asset_name):
+        return os.path.join(self.root, area, self.folders[asset_type], asset_name)
+
+    def work_dir(self, asset_type, asset_name):
+        return self._asset_dir("work", asset_type, asset_name)
+
+    def publish_dir(self, asset_type, asset_name):
+        return self._asset_dir("publish", asset_type, asset_name)
+
+    def version_log_path(self, asset_type, asset_name):
+        return os.path.join(self.work_dir(asset_type, asset_name), "work_version_log.txt")
+
+    def budget(self, asset_type):
+        return self.budgets.get(asset_type, {})
+
+
+def clear_cache():
+    _root_cache.clear()
+    _config_cache.clear()
+
+
+def find_project_root(path):
+    """ Nearest directory at or above path holding the marker file, or None. """
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    directory = os.path.abspath(directory)
+    visited = []
+    root = None
+
+    while True:
+        cached = _root_cache.get(directory)
+        if cached and os.path.isfile(os.path.join(cached, PROJECT_MARKER)):
+            root = cached
+            break
+        visited.append(directory)
+        if os.path.isfile(os.path.join(directory, PROJECT_MARKER)):
+            root = directory
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+
+    if root:
+        for directory in visited:
+            _root_cache[directory] = root
+    return root
+
+
+def load_project_config(root):
+    marker = os.path.join(root, PROJECT_MARKER)
+    try:
+        mtime = os.stat(marker).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _config_cache.get(root)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    data = {}
+    if mtime is not None and tomllib:
+        try:
+            with open(marker, "rb") as f:
+                data = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            print(f"⚠️ 無法讀取 {marker}：{e}")
+
+    config = ProjectConfig(root, data)
+    _config_cache[root] = (mtime, config)
+    return config
+
+
+def project_for_file(file_path):
+    """ ProjectConfig of the project file_path belongs to, or None. """
+    if not file_path:
+        return None
+    root = find_project_root(file_path)
+    return load_project_config(root) if root else None
+
+
+def ensure_project_marker(root):
+    """ Create a default marker in root when none exists, so the next save can find the project. """
+    marker = os.path.join(root, PROJECT_MARKER)
+    if not os.path.exists(marker):
+        with open(marker, "w", encoding="utf-8") as f:
+            f.write(DEFAULT_MARKER_TEXT)
+        clear_cache()
+    return load_project_config(root)
+
+
+def register():
+    pass
+
+def unregister():
+    pass
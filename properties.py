@@ -1,5 +1,5 @@
 import bpy
-from bpy.props import EnumProperty, StringProperty, PointerProperty
+from bpy.props import EnumProperty, StringProperty, PointerProperty, IntProperty, FloatProperty
 from bpy.types import Operator, Panel, PropertyGroup
 
 class XST_asset_props(PropertyGroup):
@@ -43,9 +43,31 @@ class XST_rigging_props(PropertyGroup):
     ) # type: ignore
 
 
+class XST_budget_props(PropertyGroup):
+    # 每種資產類型的輸出預算（存在 Add-on Preferences）
+    max_triangles: IntProperty(
+        name="三角面上限",
+        default=100000,
+        min=0,
+    ) # type: ignore
+
+    max_texture_mb: FloatProperty(
+        name="貼圖記憶體上限 (MB)",
+        default=256.0,
+        min=0.0,
+    ) # type: ignore
+
+    max_objects: IntProperty(
+        name="物件數上限",
+        default=200,
+        min=0,
+    ) # type: ignore
+
+
 classes = (
     XST_asset_props,
     XST_rigging_props,
+    XST_budget_props,
 )
 
 def register():
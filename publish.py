@@ -0,0 +1,399 @@
+import bpy
+import os
+import json
+import hashlib
+import getpass
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bpy.types import Operator, OperatorFileListElement
+from bpy.props import BoolProperty, CollectionProperty, EnumProperty, IntProperty, StringProperty
+from .trobleshooting import XST_Logger, xst_log_state
+from .project import project_for_file
+from .utils import find_layer_collection, parse_asset_from_filepath, publish_dir_for
+
+FORMAT_ITEMS = [
+    ("FBX", "FBX", ""),
+    ("GLTF", "glTF", ""),
+    ("USD", "USD", ""),
+]
+
+FORMAT_EXTENSIONS = {
+    "FBX": ".fbx",
+    "GLTF": ".glb",
+    "USD": ".usdc",
+}
+
+# 匯出設定也列入 hash，設定改變時會重新匯出
+EXPORT_SETTINGS = {
+    "FBX": {
+        "use_active_collection": True,
+        "use_visible": True,
+        "apply_scale_options": "FBX_SCALE_ALL",
+        "add_leaf_bones": False,
+        "bake_anim": False,
+    },
+    "GLTF": {
+        "use_active_collection": True,
+        "use_visible": True,
+        "export_format": "GLB",
+    },
+    "USD": {
+        "selected_objects_only": True,
+        "visible_objects_only": True,
+    },
+}
+
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+HEADLESS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "headless.py")
+
+
+# ----------------------------
+# Hash / 發佈紀錄
+# ----------------------------
+
+def _record_path(publish_dir, fmt):
+    # 每種格式分開記錄，平行匯出同一資產的不同格式時不會互相覆寫
+    return os.path.join(publish_dir, f".publish_{fmt.lower()}.json")
+
+
+def _read_record(publish_dir, fmt):
+    try:
+        with open(_record_path(publish_dir, fmt), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_record(publish_dir, fmt, record):
+    path = _record_path(publish_dir, fmt)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def settings_hash(fmt):
+    payload = json.dumps({"format": fmt, "settings": EXPORT_SETTINGS[fmt]}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def source_hash(file_path, previous=None):
+    """
+    sha256 of the .blend on disk. When size and mtime match the previous
+    publish record the stored hash is reused without reading the file.
+    """
+    stat = os.stat(file_path)
+    if previous and previous.get("source_size") == stat.st_size \
+            and previous.get("source_mtime_ns") == stat.st_mtime_ns and previous.get("source_hash"):
+        return previous["source_hash"], stat
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest(), stat
+
+
+# ----------------------------
+# Export
+# ----------------------------
+
+def _select_collection_objects(context, collection):
+    for obj in context.view_layer.objects:
+        obj.select_set(False)
+    for obj in collection.all_objects:
+        if obj.name in context.view_layer.objects and obj.visible_get():
+            obj.select_set(True)
+
+
+def export_collection(context, collection, fmt, file_path):
+    layer_collection = find_layer_collection(context.view_layer.layer_collection, collection)
+    if layer_collection:
+        context.view_layer.active_layer_collection = layer_collection
+
+    settings = EXPORT_SETTINGS[fmt]
+    if fmt == "FBX":
+        return bpy.ops.export_scene.fbx(filepath=file_path, **settings)
+    if fmt == "GLTF":
+        return bpy.ops.export_scene.gltf(filepath=file_path, **settings)
+    if fmt == "USD":
+        _select_collection_objects(context, collection)
+        return bpy.ops.wm.usd_export(filepath=file_path, **settings)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def run_export_checks(context):
+    """ Run the export checks; returns an error message, or '' when the asset may be published. """
+    result = bpy.ops.xanthus_studio_tools.model_export_check()
+    if result != {"FINISHED"}:
+        return "模型匯出檢查失敗"
+    errors = xst_log_state(context).error_count
+    if errors:
+        return f"模型匯出檢查有 {errors} 個錯誤"
+    return ""
+
+
+def publish_target(file_path):
+    """ (asset type, asset name, publish dir) of a work file; RuntimeError when it cannot be published. """
+    asset = parse_asset_from_filepath(file_path)
+    if not asset:
+        raise RuntimeError("檔名格式錯誤，無法解析名稱與類型")
+    asset_type, asset_name = asset
+
+    project = project_for_file(file_path)
+    if project and asset_type in project.folders:
+        publish_dir = project.publish_dir(asset_type, asset_name)
+    else:
+        publish_dir = publish_dir_for(file_path)
+    if not publish_dir:
+        raise RuntimeError("檔案不在 work/ 目錄下，無法決定發佈路徑")
+    return asset_type, asset_name, publish_dir
+
+
+def plan_publish(file_path, formats, force=False):
+    """
+    Compare the source and settings hashes with the publish records, without
+    opening the file. Returns ([(format, 'SKIPPED', path)] for up-to-date
+    formats, [(format, out path, record)] for the ones to export).
+    """
+    asset_type, asset_name, publish_dir = publish_target(file_path)
+    skipped = []
+    pending = []
+    for fmt in formats:
+        previous = _read_record(publish_dir, fmt)
+        src_hash, stat = source_hash(file_path, previous)
+        out_path = os.path.join(publish_dir, f"{asset_type}_{asset_name}{FORMAT_EXTENSIONS[fmt]}")
+        record = {
+            "source": file_path,
+            "source_hash": src_hash,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "settings_hash": settings_hash(fmt),
+            "file": out_path,
+        }
+        unchanged = (
+            previous.get("source_hash") == record["source_hash"]
+            and previous.get("settings_hash") == record["settings_hash"]
+            and os.path.exists(out_path)
+        )
+        if unchanged and not force:
+            skipped.append((fmt, "SKIPPED", out_path))
+        else:
+            pending.append((fmt, out_path, record))
+    return skipped, pending
+
+
+def publish_current_file(context, formats, force=False):
+    """
+    Export the 6_{type}_{name} collection of the open file to publish/.
+    Returns [(format, status, path)] where status is 'EXPORTED', 'SKIPPED' or 'FAILED'.
+    """
+    file_path = bpy.data.filepath
+    if not file_path:
+        raise RuntimeError("請先儲存檔案")
+    if bpy.data.is_dirty:
+        raise RuntimeError("檔案有未儲存的變更，請先存檔再發佈")
+
+    asset_type, asset_name, publish_dir = publish_target(file_path)
+
+    # 先判斷哪些格式需要匯出，全部未變更時不跑檢查
+    results, pending = plan_publish(file_path, formats, force)
+    if not pending:
+        return results
+
+    error = run_export_checks(context)
+    if error:
+        raise RuntimeError(error)
+
+    collection = context.scene.collection.children.get(f"6_{asset_type}_{asset_name}")
+    os.makedirs(publish_dir, exist_ok=True)
+
+    for fmt, out_path, record in pending:
+        if export_collection(context, collection, fmt, out_path) != {"FINISHED"}:
+            results.append((fmt, "FAILED", out_path))
+            continue
+        record["user"] = getpass.getuser()
+        record["time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _write_record(publish_dir, fmt, record)
+        results.append((fmt, "EXPORTED", out_path))
+
+    return results
+
+
+# ----------------------------
+# Batch（每個待匯出的資產/格式一個背景 Blender）
+# ----------------------------
+
+def _publish_subprocess(blend_path, fmt, force):
+    cmd = [
+        bpy.app.binary_path,
+        "-b", blend_path,
+        "--python-exit-code", "1",
+        "--python", HEADLESS_SCRIPT,
+        "--", "publish", "--formats", fmt,
+    ]
+    if force:
+        cmd.append("--force")
+    proc = subprocess.run(cmd, capture_output=True, text=True, errors="replace")
+    return blend_path, fmt, "EXPORTED" if proc.returncode == 0 else "FAILED", proc.stdout + proc.stderr
+
+
+def _plan_batch_file(blend_path, formats, force):
+    try:
+        return plan_publish(blend_path, formats, force), ""
+    except (RuntimeError, OSError) as e:
+        return None, str(e)
+
+
+def publish_batch(blend_paths, formats, jobs=None, force=False):
+    """
+    Publish several files/formats at once; returns [(path, format, status, output)].
+    Up-to-date (file, format) pairs are skipped here, so Blender is only started
+    for the pairs that actually need an export.
+    """
+    jobs = jobs or max(1, (os.cpu_count() or 2) // 2)
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        plans = list(pool.map(lambda path: _plan_batch_file(path, formats, force), blend_paths))
+
+        futures = []
+        for path, (plan, error) in zip(blend_paths, plans):
+            if plan is None:
+                results.extend((path, fmt, "FAILED", error) for fmt in formats)
+                continue
+            skipped, pending = plan
+            results.extend((path, fmt, status, out_path) for fmt, status, out_path in skipped)
+            futures.extend(pool.submit(_publish_subprocess, path, fmt, force) for fmt, _, _ in pending)
+        results.extend(future.result() for future in futures)
+    return results
+
+
+def headless_publish(args):
+    """ `headless.py publish` entry: batch when files are given, otherwise the open file. """
+    formats = [fmt.upper() for fmt in args.formats]
+    if args.files:
+        failed = 0
+        for path, fmt, status, output in publish_batch(args.files, formats, args.jobs, args.force):
+            print(f"[publish] {status} {fmt} {path}")
+            if status == "FAILED":
+                failed += 1
+                print(output)
+        return 1 if failed else 0
+
+    try:
+        results = publish_current_file(bpy.context, formats, force=args.force)
+    except RuntimeError as e:
+        print(f"[publish] FAILED {bpy.data.filepath}: {e}")
+        return 1
+    for fmt, status, path in results:
+        print(f"[publish] {status} {fmt} {path}")
+    return 1 if any(status == "FAILED" for _, status, _ in results) else 0
+
+
+# ----------------------------
+# Operators
+# ----------------------------
+
+class XST_OT_publish_asset(Operator):
+    bl_idname = "xanthus_studio_tools.publish_asset"
+    bl_label = "發佈資產"
+
+    formats: EnumProperty(
+        name="格式",
+        items=FORMAT_ITEMS,
+        options={"ENUM_FLAG"},
+        default={"FBX"},
+    ) # type: ignore
+
+    force: BoolProperty(
+        name="強制匯出",
+        description="忽略來源與設定未變更的判斷",
+        default=False,
+    ) # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        if not self.formats:
+            self.report({"ERROR"}, "請選擇匯出格式")
+            return {"CANCELLED"}
+
+        try:
+            results = publish_current_file(context, [f for f, _, _ in FORMAT_ITEMS if f in self.formats], self.force)
+        except RuntimeError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+
+        for fmt, status, path in results:
+            self.report({"WARNING"} if status == "FAILED" else {"INFO"}, f"{fmt}: {status} {path}")
+
+        if any(status == "FAILED" for _, status, _ in results):
+            return {"CANCELLED"}
+        return {"FINISHED"}
+
+
+class XST_OT_publish_batch(Operator):
+    bl_idname = "xanthus_studio_tools.publish_batch"
+    bl_label = "批次發佈"
+
+    directory: StringProperty(subtype="DIR_PATH") # type: ignore
+    files: CollectionProperty(type=OperatorFileListElement) # type: ignore
+    filter_glob: StringProperty(default="*.blend", options={"HIDDEN"}) # type: ignore
+
+    formats: EnumProperty(
+        name="格式",
+        items=FORMAT_ITEMS,
+        options={"ENUM_FLAG"},
+        default={"FBX"},
+    ) # type: ignore
+
+    jobs: IntProperty(
+        name="同時執行數",
+        default=max(1, (os.cpu_count() or 2) // 2),
+        min=1,
+    ) # type: ignore
+
+    force: BoolProperty(name="強制匯出", default=False) # type: ignore
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context):
+        paths = [os.path.join(self.directory, f.name) for f in self.files if f.name.endswith(".blend")]
+        if not paths or not self.formats:
+            self.report({"ERROR"}, "請選擇 .blend 檔案與匯出格式")
+            return {"CANCELLED"}
+
+        logger = XST_Logger(context)
+        logger.clear()
+
+        failed = 0
+        formats = [f for f, _, _ in FORMAT_ITEMS if f in self.formats]
+        for path, fmt, status, output in publish_batch(paths, formats, self.jobs, self.force):
+            if status == "EXPORTED":
+                logger.log(f"{fmt} 發佈完成", details=path, level="INFO", target_label=os.path.basename(path))
+            elif status == "SKIPPED":
+                logger.log(f"{fmt} 未變更，略過", details=output, level="INFO", target_label=os.path.basename(path))
+            else:
+                failed += 1
+                logger.log(f"{fmt} 發佈失敗", details=output[-1000:], level="ERROR", target_label=os.path.basename(path))
+
+        self.report({"WARNING"} if failed else {"INFO"}, f"批次發佈完成，失敗 {failed} 個")
+        return {"FINISHED"}
+
+
+classes = (
+    XST_OT_publish_asset,
+    XST_OT_publish_batch,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,281 @@
+import bpy
+import struct
+import hashlib
+from bpy.types import Operator
+from bpy.props import BoolProperty, EnumProperty
+from .trobleshooting import XST_Logger
+from .utils import parse_asset_from_filepath
+from .validation import source_library
+
+try:
+    import numpy as np
+except ImportError:  # numpy ships with Blender; only missing in stripped-down builds
+    np = None
+
+# 座標四捨五入到此位數再比對，忽略浮點誤差
+COORD_DECIMALS = 5
+
+# attribute data_type -> (foreach_get 欄位, 每個元素的數值個數, numpy dtype)
+ATTRIBUTE_LAYOUT = {
+    "FLOAT": ("value", 1, "f4"),
+    "INT": ("value", 1, "i4"),
+    "FLOAT_VECTOR": ("vector", 3, "f4"),
+    "FLOAT_COLOR": ("color", 4, "f4"),
+    "BYTE_COLOR": ("color", 4, "f4"),
+    "FLOAT2": ("vector", 2, "f4"),
+    "BOOLEAN": ("value", 1, "?"),
+    "INT8": ("value", 1, "i4"),
+    "INT32_2D": ("value", 2, "i4"),
+    "QUATERNION": ("value", 4, "f4"),
+    "FLOAT4X4": ("value", 16, "f4"),
+}
+
+
+def _read(collection, attr, count, dtype):
+    values = np.empty(count, dtype=dtype)
+    collection.foreach_get(attr, values)
+    return values
+
+
+def _compared_attributes(mesh):
+    # 編輯模式的選取狀態不影響算圖與變形，不列入比對
+    return sorted(
+        (attr for attr in mesh.attributes if not attr.name.startswith(".select_")),
+        key=lambda attr: attr.name,
+    )
+
+
+def _domain_size(mesh, domain):
+    return {
+        "POINT": len(mesh.vertices),
+        "EDGE": len(mesh.edges),
+        "FACE": len(mesh.polygons),
+        "CORNER": len(mesh.loops),
+    }.get(domain)
+
+
+def mesh_signature(mesh):
+    """ Cheap key from element counts, attributes and materials; only meshes that share it are hashed. """
+    return (
+        len(mesh.vertices),
+        len(mesh.edges),
+        len(mesh.loops),
+        len(mesh.polygons),
+        tuple((attr.name, attr.domain, attr.data_type) for attr in _compared_attributes(mesh)),
+        tuple(mat.name if mat else "" for mat in mesh.materials),
+    )
+
+
+def mergeable(mesh):
+    """ False for meshes whose data is not fully covered by the hashes below. """
+    if mesh.shape_keys or mesh.has_custom_normals:
+        return False
+    return all(attr.data_type in ATTRIBUTE_LAYOUT for attr in _compared_attributes(mesh))
+
+
+def mesh_geometry_hash(mesh):
+    """
+    Hash of positions, topology and every mesh attribute (material index, UVs,
+    colors, sharp / crease flags, ...), read in bulk with foreach_get into
+    numpy arrays.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    co = _read(mesh.vertices, "co", len(mesh.vertices) * 3, np.float32)
+    # + 0.0 把 -0.0 轉成 0.0，避免相同座標得到不同 hash
+    digest.update((np.round(co, COORD_DECIMALS) + 0.0).tobytes())
+    digest.update(_read(mesh.loops, "vertex_index", len(mesh.loops), np.int32).tobytes())
+    digest.update(_read(mesh.polygons, "loop_total", len(mesh.polygons), np.int32).tobytes())
+    digest.update(_read(mesh.polygons, "material_index", len(mesh.polygons), np.int32).tobytes())
+
+    for attr in _compared_attributes(mesh):
+        if attr.name == "position":
+            continue
+        field, width, dtype = ATTRIBUTE_LAYOUT[attr.data_type]
+        values = _read(attr.data, field, _domain_size(mesh, attr.domain) * width, dtype)
+        if dtype == "f4":
+            values = np.round(values, COORD_DECIMALS) + 0.0
+        digest.update(f"{attr.name}|{attr.domain}|{attr.data_type}".encode("utf-8"))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def mesh_deform_hash(mesh, users):
+    """
+    Hash of the vertex group weights, with group indices tied to the group
+    names of the objects; None when the users disagree on their group lists.
+    """
+    group_names = {tuple(vg.name for vg in obj.vertex_groups) for obj in users}
+    if len(group_names) != 1:
+        return None
+    names = group_names.pop()
+    digest = hashlib.blake2b("\0".join(names).encode("utf-8"), digest_size=16)
+    if names:
+        # 權重沒有 foreach_get 可用，只對幾何已相同的 mesh 逐點讀取
+        for vert in mesh.vertices:
+            for group in vert.groups:
+                digest.update(struct.pack("<iif", vert.index, group.group, round(group.weight, COORD_DECIMALS)))
+    return digest.hexdigest()
+
+
+def mesh_memory_estimate(mesh):
+    """ Rough in-memory size of the mesh arrays in bytes. """
+    loops = len(mesh.loops)
+    return (
+        len(mesh.vertices) * 12          # position
+        + len(mesh.edges) * 8            # edge vertices
+        + loops * 8                      # corner vertex + edge
+        + len(mesh.polygons) * 4         # face offsets
+        + loops * 8 * len(mesh.uv_layers)
+    )
+
+
+def scatter_objects(asset_col):
+    """ Mesh objects in the Geo-Scatter* collections under asset_col. """
+    found = {}
+    for col in asset_col.children_recursive:
+        if col.name.startswith("Geo-Scatter"):
+            for obj in col.all_objects:
+                if obj.type == "MESH":
+                    found[obj.session_uid] = obj
+    return list(found.values())
+
+
+def find_duplicate_meshes(objects):
+    """
+    Groups of distinct meshes with identical geometry, as [[(mesh, [objects])]],
+    each group sorted so the mesh with the most users comes first.
+    """
+    users = {}
+    meshes = {}
+    for obj in objects:
+        mesh = obj.data
+        if source_library(mesh) is not None or not mergeable(mesh):
+            continue
+        meshes[mesh.session_uid] = mesh
+        users.setdefault(mesh.session_uid, []).append(obj)
+
+    # 先用元素數量分桶，只有同桶超過一個 mesh 時才讀頂點資料
+    buckets = {}
+    for uid, mesh in meshes.items():
+        buckets.setdefault(mesh_signature(mesh), []).append(uid)
+
+    geometry = {}
+    for uids in buckets.values():
+        if len(uids) < 2:
+            continue
+        for uid in uids:
+            geometry.setdefault(mesh_geometry_hash(meshes[uid]), []).append(uid)
+
+    # 幾何相同時再比對權重；合併後每個物件都要能用同一份權重
+    index = {}
+    for key, uids in geometry.items():
+        if len(uids) < 2:
+            continue
+        for uid in uids:
+            deform = mesh_deform_hash(meshes[uid], users[uid])
+            if deform is not None:
+                index.setdefault((key, deform), []).append(uid)
+
+    groups = []
+    for uids in index.values():
+        if len(uids) < 2:
+            continue
+        uids.sort(key=lambda uid: (-meshes[uid].users, meshes[uid].name))
+        groups.append([(meshes[uid], users[uid]) for uid in uids])
+    groups.sort(key=lambda group: -mesh_memory_estimate(group[0][0]) * (len(group) - 1))
+    return groups
+
+
+def merge_duplicates(groups):
+    """ Point every object of a group at its first mesh and remove meshes left without users. """
+    orphans = []
+    for group in groups:
+        canonical = group[0][0]
+        for mesh, objects in group[1:]:
+            for obj in objects:
+                obj.data = canonical
+            if mesh.users == 0:
+                orphans.append(mesh)
+    if orphans:
+        bpy.data.batch_remove(orphans)
+    return len(orphans)
+
+
+class XST_OT_scatter_analysis(Operator):
+    bl_idname = "xanthus_studio_tools.scatter_analysis"
+    bl_label = "Scatter 重複網格分析"
+    bl_options = {"REGISTER", "UNDO"}
+
+    scope: EnumProperty(
+        name="範圍",
+        items=[
+            ("SCATTER", "Geo-Scatter", "只分析 Geo-Scatter collection"),
+            ("ASSET", "整個資產", "分析 6_ 資產 collection 內所有 mesh"),
+        ],
+        default="SCATTER",
+    ) # type: ignore
+
+    merge: BoolProperty(
+        name="合併",
+        description="把重複的 mesh 改成共用同一份資料",
+        default=False,
+    ) # type: ignore
+
+    def execute(self, context):
+        if np is None:
+            self.report({"ERROR"}, "需要 numpy")
+            return {"CANCELLED"}
+
+        props = context.scene.xst_asset_panel_props
+        asset = parse_asset_from_filepath(bpy.data.filepath) if bpy.data.filepath else None
+        asset_type, asset_name = asset if asset else (props.asset_type, props.asset_name.strip())
+        asset_col = context.scene.collection.children.get(f"6_{asset_type}_{asset_name}")
+        if not asset_col:
+            self.report({"ERROR"}, f"找不到 Collection: 6_{asset_type}_{asset_name}")
+            return {"CANCELLED"}
+
+        if self.scope == "SCATTER":
+            objects = scatter_objects(asset_col)
+        else:
+            objects = [obj for obj in asset_col.all_objects if obj.type == "MESH"]
+
+        groups = find_duplicate_meshes(objects)
+
+        logger = XST_Logger(context)
+        logger.clear()
+        total_saving = 0
+        for group in groups:
+            canonical, canonical_users = group[0]
+            saving = mesh_memory_estimate(canonical) * (len(group) - 1)
+            total_saving += saving
+            logger.log(
+                f"Duplicate geometry: {len(group)} meshes, {saving / (1024 * 1024):.2f} MB saveable",
+                details=", ".join(mesh.name for mesh, _ in group),
+                level="WARNING",
+                target_type="OBJECT",
+                target_object=canonical_users[0],
+                target_label=canonical.name,
+            )
+
+        removed = merge_duplicates(groups) if self.merge else 0
+        logger.log(
+            f"Scatter analysis: {len(objects)} objects, {len(groups)} duplicate groups, "
+            f"{total_saving / (1024 * 1024):.2f} MB saveable" + (f", {removed} meshes merged" if self.merge else ""),
+            level="INFO",
+        )
+
+        self.report({"INFO"}, f"找到 {len(groups)} 組重複網格")
+        return {"FINISHED"}
+
+
+classes = (
+    XST_OT_scatter_analysis,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,363 @@
+"""
+Content-addressed chunk store for saved work versions.
+
+A saved .blend is split into chunks, every chunk is stored once under
+{project}/.xst_store/chunks/ by its sha256, and the version keeps only a
+small manifest ("<file>.blend.xstm") listing its chunks. Chunk boundaries are
+content-defined: a cut is made wherever a rolling gear hash over the last
+WINDOW bytes matches CUT_MASK (vectorized with numpy), so inserting or
+removing data only changes the chunks around the edit. Runs without a cut
+are split every MAX_CHUNK. Without numpy the same cuts are found by a plain
+Python loop, only slower.
+
+Only cold versions are dehydrated (their .blend removed): files not modified
+for COLD_VERSION_AGE that no other file links as a library, since Blender's
+library loader reads the .blend path directly.
+"""
+import os
+import json
+import mmap
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # numpy ships with Blender; only missing in stripped-down builds
+    np = None
+
+STORE_DIR_NAME = ".xst_store"
+MANIFEST_SUFFIX = ".xstm"
+MANIFEST_VERSION = 1
+
+MIN_CHUNK = 256 * 1024
+CUT_MASK = (1 << 20) - 1            # 超過 MIN_CHUNK 後平均約 1 MB 出現一次切點
+MAX_CHUNK = 8 * 1024 * 1024
+WINDOW = 48                         # rolling hash 視窗（bytes）
+SEGMENT = 16 * 1024 * 1024          # 每次向量化處理的長度，限制暫存陣列大小
+FETCH_THREADS = 8
+COLD_VERSION_AGE = 30 * 24 * 3600    # 超過此時間未修改的版本才移除 .blend
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "xanthus_studio_tools", "chunks")
+DEFAULT_CACHE_LIMIT = 20 * 1024 * 1024 * 1024
+
+_gear = None
+
+
+# ----------------------------
+# Chunking
+# ----------------------------
+
+def _gear_table():
+    global _gear
+    if _gear is None:
+        # 由 sha256 產生固定的表，不受 numpy 版本的亂數實作影響
+        _gear = [int.from_bytes(hashlib.sha256(b"xst-gear-%d" % i).digest()[:4], "little") for i in range(256)]
+    return _gear
+
+
+def _cut_candidates(buf, length):
+    """
+    Offsets o (in order) where the gear hash of the WINDOW bytes before o
+    matches CUT_MASK. The hash is the uint32 sum of a per-byte gear value
+    over the window, vectorized per segment as a difference of prefix sums.
+    """
+    gear = np.array(_gear_table(), dtype=np.uint32)
+    data = np.frombuffer(buf, dtype=np.uint8, count=length)
+    found = []
+    for start in range(WINDOW, length + 1, SEGMENT):
+        stop = min(start + SEGMENT, length + 1)
+        prefix = np.zeros(stop - start + WINDOW, dtype=np.uint32)
+        np.cumsum(gear[data[start - WINDOW:stop - 1]], dtype=np.uint32, out=prefix[1:])
+        hashes = prefix[WINDOW:] - prefix[:-WINDOW]
+        found.extend((np.flatnonzero((hashes & CUT_MASK) == 0) + start).tolist())
+    return found
+
+
+def _cut_candidates_py(buf, length):
+    """ Same cuts as _cut_candidates without numpy (much slower). """
+    gear = _gear_table()
+    found = []
+    h = sum(gear[b] for b in buf[:WINDOW]) & 0xFFFFFFFF
+    if not h & CUT_MASK:
+        found.append(WINDOW)
+    for offset in range(WINDOW, length):
+        h = (h + gear[buf[offset]] - gear[buf[offset - WINDOW]]) & 0xFFFFFFFF
+        if not h & CUT_MASK:
+            found.append(offset + 1)
+    return found
+
+
+def _content_boundaries(buf):
+    boundaries = []
+    last = 0
+    candidates = _cut_candidates if np is not None else _cut_candidates_py
+    for offset in candidates(buf, len(buf)):
+        while offset - last > MAX_CHUNK:
+            last += MAX_CHUNK
+            boundaries.append(last)
+        if offset - last >= MIN_CHUNK:
+            boundaries.append(offset)
+            last = offset
+    while len(buf) - last > MAX_CHUNK:
+        last += MAX_CHUNK
+        boundaries.append(last)
+    return boundaries
+
+
+def chunk_boundaries(buf):
+    """ End offsets of every chunk of buf (the last one is always len(buf)). """
+    boundaries = _content_boundaries(buf) if len(buf) > WINDOW else []
+    if not boundaries or boundaries[-1] != len(buf):
+        boundaries.append(len(buf))
+    return boundaries
+
+
+# ----------------------------
+# Store
+# ----------------------------
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ChunkStore:
+    def __init__(self, root, cache_dir=None):
+        self.root = root
+        self.cache_dir = cache_dir or os.environ.get("XST_CHUNK_CACHE", DEFAULT_CACHE_DIR)
+
+    @classmethod
+    def for_project(cls, project_root):
+        return cls(os.path.join(project_root, STORE_DIR_NAME))
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.root, "chunks", digest[:2], digest)
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def has_chunk(self, digest):
+        return os.path.exists(self._chunk_path(digest))
+
+    def ingest(self, file_path):
+        """ Store every new chunk of file_path and return its manifest dict. """
+        stat = os.stat(file_path)
+        whole = hashlib.sha256()
+        chunks = []
+
+        with open(file_path, "rb") as f:
+            if stat.st_size == 0:
+                buf = b""
+            else:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                start = 0
+                for end in chunk_boundaries(buf) if stat.st_size else []:
+                    data = buf[start:end]
+                    digest = hashlib.sha256(data).hexdigest()
+                    whole.update(data)
+                    # 存檔時不寫本機快取；快取只在還原舊版本時才填
+                    if not self.has_chunk(digest):
+                        _atomic_write(self._chunk_path(digest), data)
+                    chunks.append([digest, end - start])
+                    start = end
+            finally:
+                if stat.st_size:
+                    buf.close()
+
+        return {
+            "version": MANIFEST_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": whole.hexdigest(),
+            "chunks": chunks,
+        }
+
+    def _read_chunk(self, digest):
+        cache_path = self._cache_path(digest)
+        try:
+            with open(cache_path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+
+        with open(self._chunk_path(digest), "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise IOError(f"Corrupted chunk in store: {digest}")
+        _atomic_write(cache_path, data)
+        return data
+
+    def materialize(self, manifest, out_path):
+        """ Rebuild the original file from its manifest (local cache first, then the store). """
+        tmp_path = f"{out_path}.{os.getpid()}.tmp"
+        digests = [digest for digest, _ in manifest["chunks"]]
+        with open(tmp_path, "wb") as f, ThreadPoolExecutor(max_workers=FETCH_THREADS) as pool:
+            # map() keeps chunk order while fetching from the NAS in parallel
+            for data in pool.map(self._read_chunk, digests):
+                f.write(data)
+        if os.path.getsize(tmp_path) != manifest["size"]:
+            os.remove(tmp_path)
+            raise IOError(f"Materialized size mismatch: {out_path}")
+        os.replace(tmp_path, out_path)
+        return out_path
+
+    def prune_cache(self, limit=DEFAULT_CACHE_LIMIT):
+        """ Drop least recently used chunks from the local cache until it fits in limit bytes. """
+        entries = []
+        total = 0
+        for dir_path, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(dir_path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+# ----------------------------
+# Manifests
+# ----------------------------
+
+def manifest_path_for(file_path):
+    return file_path + MANIFEST_SUFFIX
+
+
+def write_manifest(file_path, manifest, store):
+    manifest = dict(manifest)
+    manifest["store"] = os.path.relpath(store.root, os.path.dirname(file_path))
+    path = manifest_path_for(file_path)
+    _atomic_write(path, json.dumps(manifest).encode("utf-8"))
+    return path
+
+
+def read_manifest(file_path):
+    with open(manifest_path_for(file_path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def store_for_manifest(file_path, manifest):
+    return ChunkStore(os.path.normpath(os.path.join(os.path.dirname(file_path), manifest["store"])))
+
+
+def save_version(file_path, project_root):
+    """ Ingest a freshly saved version; returns the manifest path. """
+    store = ChunkStore.for_project(project_root)
+    return write_manifest(file_path, store.ingest(file_path), store)
+
+
+# ----------------------------
+# Library references
+# ----------------------------
+
+def _refs_path(store, file_path):
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(file_path)).encode("utf-8")).hexdigest()
+    return os.path.join(store.root, "refs", key + ".json")
+
+
+def record_library_refs(file_path, project_root, library_paths):
+    """
+    Remember which .blend files file_path links from, so dehydrate_versions
+    never removes a file another file links to (Blender's library loader
+    cannot rebuild it from the manifest).
+    """
+    store = ChunkStore.for_project(project_root)
+    path = _refs_path(store, file_path)
+    if not library_paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return
+    data = {
+        "file": os.path.abspath(file_path),
+        "libraries": sorted({os.path.normcase(os.path.abspath(p)) for p in library_paths}),
+    }
+    _atomic_write(path, json.dumps(data).encode("utf-8"))
+
+
+def referenced_libraries(store):
+    """ Normalized paths of every .blend some recorded file links from. """
+    referenced = set()
+    refs_dir = os.path.join(store.root, "refs")
+    try:
+        names = os.listdir(refs_dir)
+    except OSError:
+        return referenced
+    for name in names:
+        try:
+            with open(os.path.join(refs_dir, name), "r", encoding="utf-8") as f:
+                referenced.update(json.load(f)["libraries"])
+        except (OSError, ValueError, KeyError):
+            continue
+    return referenced
+
+
+def dehydrate_versions(directory, keep=(), min_age=COLD_VERSION_AGE):
+    """
+    Delete .blend files in directory whose manifest still matches them (size and
+    mtime), whose chunks are all in the store, that were not modified for
+    min_age seconds and that no recorded file links as a library. Returns the
+    removed paths.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    cutoff = time.time() - min_age
+    referenced = {}
+    removed = []
+    for name in os.listdir(directory):
+        if not name.endswith(".blend"):
+            continue
+        path = os.path.join(directory, name)
+        if os.path.abspath(path) in keep or not os.path.exists(manifest_path_for(path)):
+            continue
+        try:
+            manifest = read_manifest(path)
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            continue
+        if stat.st_size != manifest.get("size") or stat.st_mtime_ns != manifest.get("mtime_ns"):
+            continue
+        if stat.st_mtime > cutoff:
+            continue
+        store = store_for_manifest(path, manifest)
+        if store.root not in referenced:
+            referenced[store.root] = referenced_libraries(store)
+        if os.path.normcase(os.path.abspath(path)) in referenced[store.root]:
+            continue
+        if all(store.has_chunk(digest) for digest, _ in manifest["chunks"]):
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def ensure_version_file(file_path):
+    """ Make sure file_path exists on disk, rebuilding it from its manifest if needed. """
+    if os.path.exists(file_path):
+        return file_path
+    manifest = read_manifest(file_path)
+    store = store_for_manifest(file_path, manifest)
+    store.materialize(manifest, file_path)
+    store.prune_cache()
+    return file_path
+
+
+def register():
+    pass
+
+def unregister():
+    pass
@@ -1,4 +1,5 @@
 import bpy
+from bpy.app.handlers import persistent
 from bpy.types import Operator, Panel, UIList, PropertyGroup
 from bpy.props import (
     StringProperty,
@@ -8,6 +9,7 @@ from bpy.props import (
     PointerProperty,
     BoolProperty,
 )
+from .utils import get_addon_preferences
 
 # ----------------------------
 # Data Model
@@ -29,6 +31,116 @@ def _target_icon(target_type: str) -> str:
     }.get(target_type, "DOT")
 
 
+# ----------------------------
+# Redraw throttling
+# ----------------------------
+# Every change to the entries or the filter bumps _revision. Filter flags and
+# message groups are cached per (revision, filter text[, bitflag]), so sidebar
+# redraws that are triggered by anything else do not rescan the log.
+
+_revision = 0
+_drawn_revision = -1
+_filter_cache = {}
+_group_cache = {}
+
+DEFAULT_REDRAW_RATE = 4
+MAX_GROUP_ROWS = 100
+
+
+def _bump_revision():
+    global _revision
+    _revision += 1
+    _filter_cache.clear()
+    _group_cache.clear()
+    _request_redraw()
+
+
+def _redraw_interval() -> float:
+    prefs = get_addon_preferences()
+    rate = getattr(prefs, "log_redraw_rate", DEFAULT_REDRAW_RATE) if prefs else DEFAULT_REDRAW_RATE
+    return 1.0 / max(rate, 1)
+
+
+def _request_redraw():
+    if bpy.app.background:
+        return
+    if not bpy.app.timers.is_registered(_redraw_tick):
+        bpy.app.timers.register(_redraw_tick, first_interval=_redraw_interval())
+
+
+def _redraw_tick():
+    global _drawn_revision
+    if _drawn_revision == _revision:
+        # Nothing changed since the last redraw; stop the timer until the next change
+        return None
+
+    _drawn_revision = _revision
+    wm = bpy.context.window_manager
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type != "VIEW_3D":
+                continue
+            for region in area.regions:
+                if region.type == "UI":
+                    region.tag_redraw()
+
+    # Keep ticking once more so bursts of entries are drawn at most N times per second
+    return _redraw_interval()
+
+
+def _on_filter_changed(self, context):
+    _bump_revision()
+
+
+def _entry_haystack(e) -> str:
+    return " ".join([
+        e.message or "",
+        e.target_label or "",
+        (e.target_object.name if e.target_object else ""),
+        (e.target_armature.name if e.target_armature else ""),
+        (e.target_bone or ""),
+        (e.target_material.name if e.target_material else ""),
+    ]).lower()
+
+
+def log_filter_flags(state, bitflag):
+    """ Visibility flag per entry for the current filter text, cached per revision. """
+    text = (state.filter_text or "").strip().lower()
+    # The UIList and the group view ask with different bitflags; both share one revision
+    key = (text, bitflag)
+    flags = _filter_cache.get(key)
+    if flags is None or len(flags) != len(state.entries):
+        if not text:
+            flags = [bitflag] * len(state.entries)
+        else:
+            flags = [bitflag if text in _entry_haystack(e) else 0 for e in state.entries]
+        _filter_cache[key] = flags
+    return flags
+
+
+def log_message_groups(state):
+    """ [(level, message, count, first_index)] of the filtered entries, cached per revision. """
+    text = (state.filter_text or "").strip().lower()
+    groups = _group_cache.get(text)
+    if groups is None:
+        flags = log_filter_flags(state, 1)
+        found = {}
+        for index, e in enumerate(state.entries):
+            if not flags[index]:
+                continue
+            key = (e.level, e.message)
+            if key in found:
+                found[key][2] += 1
+            else:
+                found[key] = [e.level, e.message, 1, index]
+        groups = sorted(
+            (tuple(g) for g in found.values()),
+            key=lambda g: (("ERROR", "WARNING", "INFO").index(g[0]), -g[2]),
+        )
+        _group_cache[text] = groups
+    return groups
+
+
 class XST_LogEntry(PropertyGroup):
     level: EnumProperty(
         name="Level",
@@ -72,8 +184,21 @@ class XST_LogState(PropertyGroup):
         name="Filter",
         description="Filter log entries by message/target text",
         default="",
+        update=_on_filter_changed,
     )# type: ignore
 
+    group_by_message: BoolProperty(
+        name="Group By Message",
+        description="Show one row per distinct finding with its count",
+        default=False,
+        update=_on_filter_changed,
+    )# type: ignore
+
+    # Per-level summary, maintained by XST_Logger
+    info_count: IntProperty(default=0)# type: ignore
+    warning_count: IntProperty(default=0)# type: ignore
+    error_count: IntProperty(default=0)# type: ignore
+
     auto_select_on_add: BoolProperty(
         name="Auto Focus On Add",
         description="When adding a new log entry, automatically focus it",
@@ -85,6 +210,78 @@ def xst_log_state(context) -> XST_LogState:
     return context.window_manager.xst_log
 
 
+# ----------------------------
+# Reverse user index (NOT registered)
+# ----------------------------
+
+def _id_key(id_data):
+    return (id_data.name, id_data.library.filepath if id_data.library else None, id_data.session_uid)
+
+
+def _resolve(collection, keys):
+    """ Live IDs for keys; IDs removed since the index was built are skipped. """
+    found = []
+    for name, library, uid in keys:
+        id_data = collection.get(name if library is None else (name, library))
+        if id_data is not None and id_data.session_uid == uid:
+            found.append(id_data)
+    return found
+
+
+class XST_UserIndex:
+    """
+    material -> objects and data -> objects, built in one pass over bpy.data.objects.
+    material_slots covers every type that has materials (mesh, curve, metaball, ...)
+    as well as slots linked to the object instead of the data.
+
+    Only names / session_uids are kept and resolved through bpy.data on use:
+    undo and file loads free IDs, and touching a freed ID can crash Blender.
+    """
+
+    def __init__(self):
+        self.material_users = {}
+        self.data_users = {}
+        self.object_materials = {}
+
+        for obj in bpy.data.objects:
+            key = _id_key(obj)
+            data = obj.data
+            if data is not None:
+                self.data_users.setdefault(data.session_uid, []).append(key)
+
+            mats = [slot.material for slot in obj.material_slots if slot.material]
+            self.object_materials[obj.session_uid] = [_id_key(mat) for mat in mats]
+            for mat in mats:
+                users = self.material_users.setdefault(mat.session_uid, [])
+                if not users or users[-1] != key:
+                    users.append(key)
+
+    def objects_using_material(self, mat):
+        return _resolve(bpy.data.objects, self.material_users.get(mat.session_uid, []))
+
+    def objects_using_data(self, data):
+        return _resolve(bpy.data.objects, self.data_users.get(data.session_uid, []))
+
+    def materials_of(self, obj):
+        return _resolve(bpy.data.materials, self.object_materials.get(obj.session_uid, []))
+
+
+MATERIAL_OBJECT_TYPES = {"MESH", "CURVE", "SURFACE", "FONT", "META", "CURVES", "POINTCLOUD", "VOLUME"}
+
+# Shared by every XST_Logger; rebuilt lazily after each clear() (i.e. once per check run)
+_user_index = None
+
+
+@persistent
+def _drop_user_index(*args):
+    # undo / file load replace the IDs the index was built from
+    global _user_index
+    _user_index = None
+
+
+_INDEX_HANDLERS = ("load_post", "undo_post", "redo_post")
+
+
 # ----------------------------
 # Logger helper (NOT registered)
 # ----------------------------
@@ -93,9 +290,21 @@ class XST_Logger:
     def __init__(self, context):
         self.state = xst_log_state(context)
 
+    def user_index(self, refresh: bool = False) -> XST_UserIndex:
+        global _user_index
+        if _user_index is None or refresh:
+            _user_index = XST_UserIndex()
+        return _user_index
+
     def clear(self):
+        global _user_index
+        _user_index = None
         self.state.entries.clear()
         self.state.index = -1
+        self.state.info_count = 0
+        self.state.warning_count = 0
+        self.state.error_count = 0
+        _bump_revision()
 
     def log(
         self,
@@ -122,7 +331,15 @@ class XST_Logger:
         e.target_material = target_material
         e.target_label = target_label
 
+        if level == "INFO":
+            self.state.info_count += 1
+        elif level == "WARNING":
+            self.state.warning_count += 1
+        else:
+            self.state.error_count += 1
+
         self.state.index = len(self.state.entries) - 1
+        _bump_revision()
         return e
 
 
@@ -146,6 +363,17 @@ class XST_OT_log_focus(Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     index: IntProperty(default=-1)# type: ignore
+    select_data_users: BoolProperty(
+        name="Select Data Users",
+        description="Also select every object sharing the target's data (Shift+Click)",
+        default=False,
+        options={"SKIP_SAVE"},
+    )# type: ignore
+
+    def invoke(self, context, event):
+        if event.shift:
+            self.select_data_users = True
+        return self.execute(context)
 
     def execute(self, context):
         state = xst_log_state(context)
@@ -155,11 +383,16 @@ class XST_OT_log_focus(Operator):
 
         e = state.entries[idx]
 
-        # Focus OBJECT
+        # Focus OBJECT (with select_data_users: every object sharing its data, via the reverse index)
         if e.target_type == "OBJECT" and e.target_object:
             obj = e.target_object
-            if obj.name in context.view_layer.objects:
+            view_layer_objects = context.view_layer.objects
+            if obj.name in view_layer_objects:
                 bpy.ops.object.select_all(action="DESELECT")
+                if self.select_data_users and obj.data is not None:
+                    for user in XST_Logger(context).user_index().objects_using_data(obj.data):
+                        if user.name in view_layer_objects:
+                            user.select_set(True)
                 obj.select_set(True)
                 context.view_layer.objects.active = obj
                 # View framing is optional; it requires a 3D view context to be present
@@ -194,14 +427,13 @@ class XST_OT_log_focus(Operator):
 
             return {"CANCELLED"}
 
-        # Focus MATERIAL (select objects using it, best-effort)
+        # Focus MATERIAL (select objects using it, via the reverse index)
         if e.target_type == "MATERIAL" and e.target_material:
-            mat = e.target_material
-            users = []
-            for obj in context.scene.objects:
-                if obj.type == "MESH" and obj.data and hasattr(obj.data, "materials"):
-                    if mat in obj.data.materials:
-                        users.append(obj)
+            view_layer_objects = context.view_layer.objects
+            users = [
+                obj for obj in XST_Logger(context).user_index().objects_using_material(e.target_material)
+                if obj.name in view_layer_objects
+            ]
 
             if users:
                 bpy.ops.object.select_all(action="DESELECT")
@@ -226,18 +458,25 @@ class XST_OT_check_selected_missing_materials(Operator):
         logger = XST_Logger(context)
 
         for obj in context.selected_objects:
-            if obj.type != "MESH":
+            if obj.type not in MATERIAL_OBJECT_TYPES:
                 continue
-            mats = getattr(obj.data, "materials", None)
-            if not mats or len(mats) == 0:
-                logger.log(
-                    "Mesh has no material slots",
-                    details=f"Object '{obj.name}' has no materials assigned.",
-                    level="WARNING",
-                    target_type="OBJECT",
-                    target_object=obj,
-                    target_label=obj.name,
-                )
+            # Same checks as validation.validate_object: no slots vs. empty slots
+            if not obj.material_slots:
+                message = "Mesh has no material slots" if obj.type == "MESH" else "Object has no material slots"
+                details = f"Object '{obj.name}' has no materials assigned."
+            elif any(slot.material is None for slot in obj.material_slots):
+                message = "Empty material slot"
+                details = f"Object '{obj.name}' has material slots without a material."
+            else:
+                continue
+            logger.log(
+                message,
+                details=details,
+                level="WARNING",
+                target_type="OBJECT",
+                target_object=obj,
+                target_label=obj.name,
+            )
 
         return {"FINISHED"}
 
@@ -251,42 +490,19 @@ class XST_UL_log_entries(UIList):
 
     def filter_items(self, context, data, propname):
         state = xst_log_state(context)
-        flt_flags = []
-        flt_neworder = []
-
-        items = getattr(data, propname)
-        text = (state.filter_text or "").strip().lower()
-
-        if not text:
-            flt_flags = [self.bitflag_filter_item] * len(items)
-            return flt_flags, flt_neworder
-
-        for e in items:
-            hay = " ".join([
-                e.message or "",
-                e.target_label or "",
-                (e.target_object.name if e.target_object else ""),
-                (e.target_armature.name if e.target_armature else ""),
-                (e.target_bone or ""),
-                (e.target_material.name if e.target_material else ""),
-            ]).lower()
-
-            flt_flags.append(self.bitflag_filter_item if text in hay else 0)
-
-        return flt_flags, flt_neworder
+        # template_list only draws the visible rows; the filter pass is the O(n) part
+        return log_filter_flags(state, self.bitflag_filter_item), []
 
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index=0):
         e: XST_LogEntry = item
 
         row = layout.row(align=True)
-        row.label(text="", icon=_level_icon(e.level))
-        row.label(text=e.message or "", icon=_target_icon(e.target_type))
-
-        if e.target_label:
-            row.label(text=e.target_label, icon="LINKED")
+        text = f"{e.message}  [{e.target_label}]" if e.target_label else (e.message or "")
+        row.label(text=text, icon=_level_icon(e.level))
 
-        op = row.operator("xst.log_focus", text="", icon="VIEWZOOM")
-        op.index = index
+        if e.target_type != "NONE":
+            op = row.operator("xst.log_focus", text="", icon="VIEWZOOM")
+            op.index = index
 
 
 class XST_PT_log(Panel):
@@ -303,22 +519,41 @@ class XST_PT_log(Panel):
 
         header = layout.row(align=True)
         header.prop(state, "filter_text", text="", icon="VIEWZOOM")
+        header.prop(state, "group_by_message", text="", icon="LINENUMBERS_ON")
         header.operator("xst.log_clear", text="", icon="TRASH")
 
-        layout.template_list(
-            "XST_UL_log_entries",
-            "",
-            state,
-            "entries",
-            state,
-            "index",
-            rows=6,
-        )
+        summary = layout.row(align=True)
+        summary.label(text=str(state.error_count), icon=_level_icon("ERROR"))
+        summary.label(text=str(state.warning_count), icon=_level_icon("WARNING"))
+        summary.label(text=str(state.info_count), icon=_level_icon("INFO"))
+
+        if state.group_by_message:
+            groups = log_message_groups(state)
+            box = layout.box()
+            col = box.column(align=True)
+            for level, message, count, first_index in groups[:MAX_GROUP_ROWS]:
+                row = col.row(align=True)
+                row.label(text=f"{message}  x{count}", icon=_level_icon(level))
+                op = row.operator("xst.log_focus", text="", icon="VIEWZOOM")
+                op.index = first_index
+            if len(groups) > MAX_GROUP_ROWS:
+                col.label(text=f"... {len(groups) - MAX_GROUP_ROWS} more")
+        else:
+            layout.template_list(
+                "XST_UL_log_entries",
+                "",
+                state,
+                "entries",
+                state,
+                "index",
+                rows=6,
+            )
 
         layout.prop(state, "auto_select_on_add")
 
         layout.separator()
         layout.operator("xst.check_missing_materials", icon="SHADING_RENDERED")
+        layout.operator("xst.version_diff", icon="ARROW_LEFTRIGHT")
 
 
 # ----------------------------
@@ -341,7 +576,18 @@ def register():
 
     bpy.types.WindowManager.xst_log = PointerProperty(type=XST_LogState)
 
+    for name in _INDEX_HANDLERS:
+        getattr(bpy.app.handlers, name).append(_drop_user_index)
+
 def unregister():
+    for name in _INDEX_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if _drop_user_index in handlers:
+            handlers.remove(_drop_user_index)
+
+    if bpy.app.timers.is_registered(_redraw_tick):
+        bpy.app.timers.unregister(_redraw_tick)
+
     del bpy.types.WindowManager.xst_log
 
     for cls in reversed(classes):
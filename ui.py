@@ -2,7 +2,9 @@ import bpy
 import os
 import getpass
 from datetime import datetime
-from bpy.props import EnumProperty, StringProperty, PointerProperty, BoolProperty
+from bpy.props import EnumProperty, StringProperty, PointerProperty, BoolProperty, IntProperty
+from .properties import XST_budget_props
+from .profiling import on_profiling_mode_changed
 
 class XST_PT_preferences(bpy.types.AddonPreferences):
     # Preferences 面板設定
@@ -27,12 +29,56 @@ class XST_PT_preferences(bpy.types.AddonPreferences):
         description="在 3D 視窗的側邊欄顯示 Rigging 工具面板",
     ) # type: ignore
 
+    dedup_storage: BoolProperty(
+        name="去重儲存工作版本",
+        default=False,
+        description="另存到專案時把檔案切塊存入專案 chunk store，舊版本只保留 manifest，開啟時自動還原",
+    ) # type: ignore
+
+    profiling_mode: EnumProperty(
+        name="效能分析",
+        items=[
+            ("OFF", "關閉", "不包裝 operator，零額外開銷"),
+            ("TIMING", "計時", "記錄每個 operator execute 的次數與耗時"),
+            ("CPROFILE", "cProfile", "計時並在工作檔旁輸出 .prof 檔"),
+        ],
+        default="OFF",
+        update=on_profiling_mode_changed,
+    ) # type: ignore
+
+    log_redraw_rate: IntProperty(
+        name="Debug Log 更新頻率 (次/秒)",
+        default=4,
+        min=1,
+        max=60,
+        description="批次檢查寫入 Log 時，側邊欄每秒最多重繪次數",
+    ) # type: ignore
+
+    budget_ch: PointerProperty(type=XST_budget_props) # type: ignore
+    budget_pr: PointerProperty(type=XST_budget_props) # type: ignore
+    budget_se: PointerProperty(type=XST_budget_props) # type: ignore
+
     def draw(self, context):
         layout = self.layout
 
         box = layout.box()
         box.prop(self, "asset_panel")
 
+        box = layout.box()
+        box.prop(self, "dedup_storage")
+        box.prop(self, "log_redraw_rate")
+        box.prop(self, "profiling_mode")
+
+        box = layout.box()
+        box.label(text="輸出預算", icon="MEMORY")
+        for asset_type in ("CH", "PR", "SE"):
+            budget = getattr(self, f"budget_{asset_type.lower()}")
+            col = box.column(align=True)
+            col.label(text=asset_type)
+            col.prop(budget, "max_triangles")
+            col.prop(budget, "max_texture_mb")
+            col.prop(budget, "max_objects")
+
         box = layout.box()
         box.prop(self, "texturePanel")
 
@@ -67,16 +113,31 @@ class XST_PT_assetpanel(bpy.types.Panel):
 
         layout.operator("xanthus_studio_tools.create_collection_structure", icon="OUTLINER_COLLECTION")
 
+        row = layout.row(align=True)
+        row.operator("xanthus_studio_tools.normalize_names", text="預覽命名整理", icon="VIEWZOOM").dry_run = True
+        row.operator("xanthus_studio_tools.normalize_names", text="套用", icon="SORTALPHA").dry_run = False
+
         layout.separator()
         layout.prop(props, "file_name")
-        layout.label(text="只需選專案路徑即可", icon="INFO")
-        layout.operator("xanthus_studio_tools.save_to_project", icon="FILE_FOLDER")
+        layout.label(text="已在專案內的檔案會直接存，不需選路徑", icon="INFO")
+        row = layout.row(align=True)
+        row.operator("xanthus_studio_tools.save_to_project", icon="FILE_FOLDER")
+        row.operator("xanthus_studio_tools.save_to_project", text="", icon="FILEBROWSER").browse = True
+        layout.operator("xanthus_studio_tools.open_work_version", icon="FILE_BLEND")
 
 
         # 輸出檢查 (TODO: 未完成)
         layout.separator()
         layout.label(text="輸出檢查", icon="TOOL_SETTINGS")
         layout.operator("xanthus_studio_tools.model_export_check", icon="MESH_MONKEY")
+        row = layout.row(align=True)
+        row.operator("xanthus_studio_tools.scatter_analysis", icon="PARTICLES").merge = False
+        row.operator("xanthus_studio_tools.scatter_analysis", text="", icon="AUTOMERGE_ON").merge = True
+
+        layout.separator()
+        layout.label(text="發佈", icon="EXPORT")
+        layout.operator("xanthus_studio_tools.publish_asset", icon="EXPORT")
+        layout.operator("xanthus_studio_tools.publish_batch", icon="DOCUMENTS")
         
         
 
@@ -1,6 +1,9 @@
 import bpy
 import os   
 import getpass
+import hashlib
+from array import array
+from .worklog import append_record, read_work_version_log
 from datetime import datetime
 
 
@@ -33,7 +36,7 @@ def build_default_blend_name(asset_type, asset_name):
     return f"{asset_type}_{asset_name}_V01_mod-B01.blend"
 
 
-def write_work_version_log(file_path, asset_type, asset_name):
+def write_work_version_log(file_path, asset_type, asset_name, manifest_path=None):
     user = getpass.getuser()
     time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -50,14 +53,75 @@ def write_work_version_log(file_path, asset_type, asset_name):
         "work_version_log.txt"
     )
 
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write("-" * 60 + "\n")
-        f.write(f"User    : {user}\n")
-        f.write(f"Time    : {time_str}\n")
-        f.write(f"Asset   : {asset_type}_{asset_name}\n")
-        f.write(f"Version : {version}\n")
-        f.write(f"Path    : {file_path}\n")
-        f.write("-" * 60 + "\n\n")
+    lines = [
+        "-" * 60,
+        f"User    : {user}",
+        f"Time    : {time_str}",
+        f"Asset   : {asset_type}_{asset_name}",
+        f"Version : {version}",
+        f"Path    : {file_path}",
+    ]
+    if manifest_path:
+        lines.append(f"Manifest: {manifest_path}")
+    lines.append("-" * 60)
+
+    # 整筆紀錄在檔案鎖內一次寫入，多人同時存檔也不會交錯
+    append_record(log_path, "\n".join(lines) + "\n\n")
+
+# Blender 只保留 items 字串的指標：交出去的 list 不能清空或被回收，
+# 紀錄檔變動時建立新的 list 替換，舊的留在 _retired_work_version_items
+_work_version_key = None
+_work_version_items = [("NONE", "（無版本紀錄）", "")]
+_retired_work_version_items = []
+RETIRED_ITEM_LISTS = 16
+
+def work_version_enum_items(self, context):
+    """ EnumProperty items of the versions in the work_version_log.txt next to the open file, newest first. """
+    global _work_version_key, _work_version_items
+    log_path = os.path.join(os.path.dirname(bpy.data.filepath), "work_version_log.txt") if bpy.data.filepath else ""
+    try:
+        key = (log_path, os.stat(log_path).st_mtime_ns) if log_path else None
+    except OSError:
+        key = (log_path, None)
+    if key == _work_version_key:
+        return _work_version_items
+
+    items = []
+    seen = set()
+    for entry in reversed(read_work_version_log(log_path) if log_path else []):
+        path = entry.get("Path", "")
+        if not path or path in seen:
+            continue
+        seen.add(path)
+        label = f"{entry.get('Version', '')}  {os.path.basename(path)}"
+        items.append((path, label, entry.get("Time", "")))
+    if not items:
+        items.append(("NONE", "（無版本紀錄）", ""))
+
+    _retired_work_version_items.append(_work_version_items)
+    del _retired_work_version_items[:-RETIRED_ITEM_LISTS]
+    _work_version_key = key
+    _work_version_items = items
+    return items
+
+def parse_asset_from_filepath(file_path):
+    """ 'CH_name_V01_mod-B01.blend' -> ('CH', 'name'); None when the name is not in pipeline form. """
+    parts = os.path.basename(file_path).split("_")
+    if len(parts) < 2:
+        return None
+    return parts[0], parts[1]
+
+def publish_dir_for(file_path):
+    """ '<root>/work/char/name/x.blend' -> '<root>/publish/char/name'; None outside of work/. """
+    head = os.path.dirname(os.path.abspath(file_path))
+    tail = []
+    while True:
+        head, name = os.path.split(head)
+        if name == "work":
+            return os.path.join(head, "publish", *reversed(tail))
+        if not name:
+            return None
+        tail.append(name)
 
 def find_layer_collection(layer_collection, target_collection):
     """ Recursively search for the layer_collection that corresponds to a given collection. """
@@ -77,6 +141,32 @@ def get_prefix(name):
         return name.split("-")[0]
     return None
 
+def mesh_fingerprint(mesh):
+    """ Hash of vertex positions and face topology, read with foreach_get (no per-vertex Python). """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{len(mesh.vertices)}:{len(mesh.loops)}:{len(mesh.polygons)}".encode())
+
+    co = array("f", [0.0]) * (len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", co)
+    digest.update(co)
+
+    loop_verts = array("i", [0]) * len(mesh.loops)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    digest.update(loop_verts)
+
+    loop_totals = array("i", [0]) * len(mesh.polygons)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    digest.update(loop_totals)
+    return digest.hexdigest()
+
+def get_addon_preferences(context=None):
+    """ Return this add-on's preferences, or None when the add-on is not enabled. """
+    context = context or bpy.context
+    addon = context.preferences.addons.get(__package__ or __name__)
+    if not addon:
+        return None
+    return addon.preferences
+
 def register():
     pass
 
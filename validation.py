@@ -0,0 +1,226 @@
+import bpy
+import os
+import json
+from .trobleshooting import MATERIAL_OBJECT_TYPES, xst_log_state
+
+# 檢查規則改變時一併更新，舊的快取結果就會全部失效
+RULES_VERSION = 2
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "xanthus_studio_tools")
+
+# 連結 library 的檢查結果跨檔案共用，以 (library 路徑, mtime) 為 key
+LIBRARY_CACHE_PATH = os.path.join(CACHE_DIR, "library_validation.json")
+LIBRARY_CACHE_LIMIT = 2000
+
+# headless check 的整檔結果，檔案與其 library 的 (大小, mtime) 都沒變就不重新開檔
+FILE_CACHE_PATH = os.path.join(CACHE_DIR, "file_check.json")
+FILE_CACHE_LIMIT = 5000
+
+_caches = {}
+
+
+# ----------------------------
+# Rules
+# ----------------------------
+
+def validate_object(obj):
+    """ [(level, message, details)] for one object. """
+    findings = []
+
+    if obj.type in MATERIAL_OBJECT_TYPES:
+        if not obj.material_slots:
+            findings.append(("WARNING", "Mesh has no material slots", f"Object '{obj.name}' has no materials assigned."))
+        elif any(slot.material is None for slot in obj.material_slots):
+            findings.append(("WARNING", "Empty material slot", f"Object '{obj.name}' has material slots without a material."))
+
+    if obj.type == "MESH" and obj.data and not obj.data.polygons:
+        findings.append(("WARNING", "Mesh has no faces", f"Object '{obj.name}' has no polygons."))
+
+    if any(abs(v - 1.0) > 1e-4 for v in obj.scale):
+        findings.append(("WARNING", "Scale is not applied", f"Object '{obj.name}' scale is {tuple(round(v, 4) for v in obj.scale)}."))
+
+    return findings
+
+
+def validate_objects(objects):
+    """ {object name: findings} for objects. """
+    return {obj.name: [list(finding) for finding in validate_object(obj)] for obj in objects}
+
+
+# ----------------------------
+# Caches
+# ----------------------------
+
+def _load_cache(path):
+    if path not in _caches:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _caches[path] = json.load(f)
+        except (OSError, ValueError):
+            _caches[path] = {}
+    return _caches[path]
+
+
+def _save_cache(path, limit):
+    cache = _caches.get(path, {})
+    # 超過上限時丟掉最舊的 key（dict 保留插入順序）
+    while len(cache) > limit:
+        cache.pop(next(iter(cache)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ 無法寫入檢查快取：{e}")
+
+
+# ----------------------------
+# Linked libraries
+# ----------------------------
+
+def source_library(id_data):
+    """ Library an ID comes from, directly linked or through a library override; None for local data. """
+    if id_data.library:
+        return id_data.library
+    override = id_data.override_library
+    if override and override.reference:
+        return override.reference.library
+    return None
+
+
+def validate_library(library, objects):
+    """
+    Validate objects that come from library once per (library file, mtime).
+    Returns ({object name: findings}, fully cached), or (None, False) when the
+    library file is missing.
+    """
+    path = os.path.normpath(bpy.path.abspath(library.filepath, library=library.library))
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, False
+
+    cache = _load_cache(LIBRARY_CACHE_PATH)
+    key = f"{RULES_VERSION}|{path}|{mtime}"
+    entry = cache.get(key, {})
+
+    results = {}
+    missing = False
+    for obj in objects:
+        if obj.name not in entry:
+            entry[obj.name] = [list(finding) for finding in validate_object(obj)]
+            missing = True
+        results[obj.name] = entry[obj.name]
+
+    if missing:
+        cache[key] = entry
+        _save_cache(LIBRARY_CACHE_PATH, LIBRARY_CACHE_LIMIT)
+    return results, not missing
+
+
+# ----------------------------
+# Headless
+# ----------------------------
+
+def _file_state(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _library_states():
+    states = {}
+    for library in bpy.data.libraries:
+        path = os.path.normpath(bpy.path.abspath(library.filepath, library=library.library))
+        try:
+            states[path] = _file_state(path)
+        except OSError:
+            states[path] = None
+    return states
+
+
+def _file_key(path):
+    return f"{RULES_VERSION}|{os.path.normcase(os.path.abspath(path))}"
+
+
+def cached_file_check(path):
+    """ Stored headless check result of path, or None if the file or one of its libraries changed since. """
+    entry = _load_cache(FILE_CACHE_PATH).get(_file_key(path))
+    if not entry:
+        return None
+    try:
+        if _file_state(path) != entry["file"]:
+            return None
+        for library_path, state in entry["libraries"].items():
+            if state is None or _file_state(library_path) != state:
+                return None
+    except OSError:
+        return None
+    return entry
+
+
+def headless_check(args):
+    """
+    `headless.py check` entry: run model_export_check on each file. Files whose
+    size and mtime (and those of their libraries) match the last check are not
+    opened again. Files are never saved: the check only changes visibility in
+    memory.
+    """
+    paths = args.files or [bpy.data.filepath]
+    cache = _load_cache(FILE_CACHE_PATH)
+    failed = 0
+    checked = 0
+    for path in paths:
+        if not path:
+            print("[check] FAILED: no file given")
+            failed += 1
+            continue
+
+        # 已開啟且有未存修改的檔案，記憶體內容和磁碟不同，不能用快取
+        unsaved = path == bpy.data.filepath and bpy.data.is_dirty
+        entry = None if unsaved else cached_file_check(path)
+        if entry:
+            print(
+                f"[check] {'OK' if entry['ok'] else 'FAILED'} {path} (unchanged) "
+                f"errors={entry['errors']} warnings={entry['warnings']} info={entry['info']}"
+            )
+            if not entry["ok"]:
+                failed += 1
+            continue
+
+        if path != bpy.data.filepath:
+            bpy.ops.wm.open_mainfile(filepath=path)
+            unsaved = False
+
+        result = bpy.ops.xanthus_studio_tools.model_export_check()
+        state = xst_log_state(bpy.context)
+        ok = result == {"FINISHED"} and state.error_count == 0
+        print(
+            f"[check] {'OK' if ok else 'FAILED'} {path} "
+            f"errors={state.error_count} warnings={state.warning_count} info={state.info_count}"
+        )
+        if not ok:
+            failed += 1
+        if not unsaved:
+            cache.pop(_file_key(path), None)
+            cache[_file_key(path)] = {
+                "file": _file_state(path),
+                "libraries": _library_states(),
+                "ok": ok,
+                "errors": state.error_count,
+                "warnings": state.warning_count,
+                "info": state.info_count,
+            }
+            checked += 1
+
+    if checked:
+        _save_cache(FILE_CACHE_PATH, FILE_CACHE_LIMIT)
+    return 1 if failed else 0
+
+
+def register():
+    pass
+
+def unregister():
+    pass
@@ -0,0 +1,301 @@
+"""
+Append-only log writing that is safe with many writers.
+
+Records are appended with one write() while holding an exclusive lock on
+the log: an advisory lock (fcntl / msvcrt) on local disks, and a
+'<log>.lock' file created with O_EXCL on network shares (CIFS/SMB/NFS
+mounts, UNC paths and mapped network drives), where an advisory lock can
+succeed without locking out other clients. Inside coalesce() records are
+buffered per log and thread and written with one lock/open/write when the
+outermost block exits.
+"""
+import os
+import re
+import time
+import uuid
+import errno
+import socket
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+LOCK_TIMEOUT = 30.0
+STALE_LOCK_SECONDS = 120.0
+RETRY_DELAY = 0.01
+MAX_RETRY_DELAY = 0.2
+
+# 1：一律使用 lock file；0：一律使用 advisory lock；未設定時依檔案所在的磁碟判斷
+LOCKFILE_MODE = os.environ.get("XST_LOG_LOCKFILE", "")
+
+# advisory lock 在這些檔案系統上不一定跨 client 生效
+NETWORK_FILESYSTEMS = {"cifs", "smb3", "smbfs", "nfs", "nfs4", "afpfs", "fuse.sshfs"}
+DRIVE_REMOTE = 4
+
+_network_dirs = {}
+_coalesce_state = threading.local()
+
+
+class LockTimeout(OSError):
+    pass
+
+
+def _mount_fstype(path):
+    """ Filesystem type of the mount containing path, from /proc/mounts (Linux only). """
+    best, fstype = "", None
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # 掛載點中的空白等字元以 \040 形式跳脫
+                mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) > len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        return None
+    return fstype
+
+
+def _is_network_path(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory in _network_dirs:
+        return _network_dirs[directory]
+
+    if os.name == "nt":
+        drive = os.path.splitdrive(directory)[0]
+        if drive.startswith(("\\\\", "//")):
+            network = True
+        else:
+            try:
+                import ctypes
+                network = ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+            except (ImportError, AttributeError, OSError):
+                network = False
+    else:
+        network = _mount_fstype(os.path.realpath(directory)) in NETWORK_FILESYSTEMS
+
+    _network_dirs[directory] = network
+    return network
+
+
+def _use_lockfile(path):
+    if LOCKFILE_MODE in ("0", "1"):
+        return LOCKFILE_MODE == "1"
+    return _is_network_path(path)
+
+
+def _advisory_lock(fd, deadline):
+    """ True when an advisory lock was taken, False when the filesystem does not support one. """
+    delay = RETRY_DELAY
+    while True:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                return False
+            return True
+        except OSError as e:
+            if e.errno in (errno.ENOLCK, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOSYS):
+                return False
+            if e.errno not in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK, errno.EDEADLK):
+                raise
+        if time.monotonic() > deadline:
+            raise LockTimeout(f"Timed out waiting for lock on log file (fd {fd})")
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+def _advisory_unlock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _read_token(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _break_stale_lock(lock_path, token):
+    """
+    Move a stale lock (holding token) out of the way. It is renamed aside
+    first, so when two waiters both judge it stale only one of them gets it;
+    if what was renamed turns out to be a fresh lock it is linked back.
+    """
+    aside = f"{lock_path}.stale.{os.getpid()}.{threading.get_ident()}"
+    try:
+        os.rename(lock_path, aside)
+    except OSError:
+        return
+    try:
+        if _read_token(aside) != token:
+            # 另一個等待者已經清掉舊 lock 並建立新的，把它放回去
+            try:
+                os.link(aside, lock_path)
+            except OSError:
+                pass
+    finally:
+        try:
+            os.remove(aside)
+        except OSError:
+            pass
+
+
+def _acquire_lockfile(lock_path, deadline):
+    """ Create lock_path with O_EXCL; returns the token written into it. """
+    token = f"{socket.gethostname()} {os.getpid()} {uuid.uuid4().hex}\n"
+    delay = RETRY_DELAY
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, token.encode("utf-8"))
+            os.close(fd)
+            return token
+        except FileExistsError:
+            # 持有者當掉時留下的 lock file，超過時間就視為失效
+            try:
+                stale = time.time() - os.stat(lock_path).st_mtime > STALE_LOCK_SECONDS
+            except OSError:
+                continue
+            if stale:
+                stale_token = _read_token(lock_path)
+                if stale_token is not None:
+                    _break_stale_lock(lock_path, stale_token)
+                continue
+        if time.monotonic() > deadline:
+            raise LockTimeout(f"Timed out waiting for {lock_path}")
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+def _release_lockfile(lock_path, token):
+    # 只移除自己的 lock；被當成失效清掉後別人建立的 lock 不能刪
+    if _read_token(lock_path) == token:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def locked_append(path, timeout=LOCK_TIMEOUT):
+    """ Yield an O_APPEND fd of path while holding an exclusive lock on it. """
+    deadline = time.monotonic() + timeout
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+    lock_path = None
+    try:
+        if _use_lockfile(path) or not _advisory_lock(fd, deadline):
+            lock_path = path + ".lock"
+            token = _acquire_lockfile(lock_path, deadline)
+        try:
+            yield fd
+        finally:
+            if lock_path:
+                _release_lockfile(lock_path, token)
+            else:
+                _advisory_unlock(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def write_records(path, records):
+    """ Append records (str) to path as one locked write. """
+    if not records:
+        return
+    data = "".join(records).encode("utf-8")
+    with locked_append(path) as fd:
+        os.lseek(fd, 0, os.SEEK_END)
+        _write_all(fd, data)
+
+
+def _pending():
+    if not hasattr(_coalesce_state, "pending"):
+        _coalesce_state.depth = 0
+        _coalesce_state.pending = {}
+    return _coalesce_state.pending
+
+
+def append_record(path, record):
+    """ Append one record, or buffer it when inside coalesce() on this thread. """
+    pending = _pending()
+    if _coalesce_state.depth:
+        pending.setdefault(path, []).append(record)
+        return
+    write_records(path, [record])
+
+
+def flush():
+    """ Write the records buffered on this thread. """
+    pending = dict(_pending())
+    _coalesce_state.pending.clear()
+    for path, records in pending.items():
+        write_records(path, records)
+
+
+@contextmanager
+def coalesce():
+    """ Buffer this thread's append_record() calls and write each log once when the block exits. """
+    _pending()
+    _coalesce_state.depth += 1
+    try:
+        yield
+    finally:
+        _coalesce_state.depth -= 1
+        if not _coalesce_state.depth:
+            flush()
+
+
+def read_work_version_log(log_path):
+    """ Parse work_version_log.txt into a list of {'User', 'Time', 'Asset', 'Version', 'Path', ...} dicts. """
+    entries = []
+    current = {}
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("-" * 10):
+                    if current:
+                        entries.append(current)
+                        current = {}
+                    continue
+                key, sep, value = line.partition(":")
+                if sep:
+                    current[key.strip()] = value.strip()
+    except OSError:
+        return []
+    if current:
+        entries.append(current)
+    return entries
+
+
+def register():
+    pass
+
+def unregister():
+    pass